@@ -0,0 +1,251 @@
+"""
+Per-topic, per-question, per-level and per-week breakdowns of interview
+history.
+sessions and answers are read in columnar chunks into NumPy arrays and every
+metric is computed with bincount group-bys, so a full history of millions of
+answers is analysed in seconds. Topics are the question-bank sections (role
+track) a question belongs to; questions that are not in the static bank are
+grouped under AI_GENERATED_TOPIC. For bank items, the classical item
+difficulty (share of available points earned) and discrimination (corrected
+item-total correlation) are reported. Results are cached until the database
+changes.
+
+Only answers still in the live database are covered; archived sessions keep
+their session scores but not their answers.
+
+Usage: python analytics.py [--db PATH] [--top N] [--output report.json]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import database
+from config import ANALYTICS_CHUNK_SIZE, ANALYTICS_MIN_RESPONSES
+from database import get_connection, versioned_cache
+
+AI_GENERATED_TOPIC = "AI-generated"
+WEEK_SECONDS = 7 * 86400
+# 1970-01-01 was a Thursday; shifting by three days starts weeks on Monday
+WEEK_OFFSET_SECONDS = 3 * 86400
+
+
+def _bank_topics() -> Dict[str, str]:
+    from interview_engine import QUESTION_BANK, HR_QUESTIONS
+
+    topics = {q['question']: role for role, levels in QUESTION_BANK.items() for qs in levels.values() for q in qs}
+    topics.update({q['question']: "HR" for qs in HR_QUESTIONS.values() for q in qs})
+    return topics
+
+
+def _read_chunks(conn, sql: str, dtypes: Tuple, chunk_size: int) -> List[np.ndarray]:
+    """
+    Run sql and return one array per column, of the matching dtype. Rows are
+    fetched chunk_size at a time and each chunk is converted to typed columns
+    straight away, so no more than one chunk is ever held as Python objects.
+    """
+    cursor = conn.execute(sql)
+    chunks = [[] for _ in dtypes]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for column, values, dtype in zip(chunks, zip(*rows), dtypes):
+            column.append(np.array(values, dtype=dtype))
+    return [np.concatenate(column) if column else np.empty(0, dtype=dtype) for column, dtype in zip(chunks, dtypes)]
+
+
+def load_columns(chunk_size: int = ANALYTICS_CHUNK_SIZE, db_path: str = None) -> Dict[str, np.ndarray]:
+    """
+    sessions and answers of db_path (the current database by default) as
+    column arrays. Answer rows carry the index of their session in the
+    session arrays.
+    """
+    database._await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
+    # One read transaction, so answers and sessions come from the same snapshot
+    conn.execute('BEGIN')
+    try:
+        session_ids, roles, levels, started = _read_chunks(conn, '''
+            SELECT session_id, role, level, COALESCE(CAST(strftime('%s', start_time) AS INTEGER), -1)
+            FROM sessions
+            ORDER BY session_id
+        ''', (np.int64, str, str, np.int64), chunk_size)
+        answer_sessions, question_ids, scores = _read_chunks(conn, '''
+            SELECT session_id, COALESCE(question_id, 0), score
+            FROM answers
+            WHERE score IS NOT NULL
+        ''', (np.int64, np.int64, np.float64), chunk_size)
+        question_rows = conn.execute('SELECT question_id, question FROM questions').fetchall()
+    finally:
+        conn.execute('COMMIT')
+
+    return {
+        'session_ids': session_ids,
+        'roles': roles,
+        'levels': levels,
+        'started': started,
+        'answer_session': np.searchsorted(session_ids, answer_sessions),
+        'question_ids': question_ids,
+        'scores': scores,
+        'question_text': dict(question_rows)
+    }
+
+
+def _group_stats(codes: np.ndarray, values: np.ndarray, groups: int) -> Dict[str, np.ndarray]:
+    count = np.bincount(codes, minlength=groups)
+    total = np.bincount(codes, weights=values, minlength=groups)
+    squares = np.bincount(codes, weights=values * values, minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+    return {'count': count, 'mean': mean, 'std': std}
+
+
+def _group_correlation(codes: np.ndarray, x: np.ndarray, y: np.ndarray, groups: int) -> np.ndarray:
+    """Pearson correlation of x and y within each group, from grouped sums."""
+    n = np.bincount(codes, minlength=groups)
+    sx = np.bincount(codes, weights=x, minlength=groups)
+    sy = np.bincount(codes, weights=y, minlength=groups)
+    sxy = np.bincount(codes, weights=x * y, minlength=groups)
+    sxx = np.bincount(codes, weights=x * x, minlength=groups)
+    syy = np.bincount(codes, weights=y * y, minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        denom = np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        return np.where(denom > 0, cov / denom, np.nan)
+
+
+def _distinct_sessions(codes: np.ndarray, session_index: np.ndarray, groups: int) -> np.ndarray:
+    pairs = np.unique(codes.astype(np.int64) * (session_index.max(initial=0) + 1) + session_index)
+    return np.bincount(pairs // (session_index.max(initial=0) + 1), minlength=groups)
+
+
+def _value(x) -> Optional[float]:
+    return None if np.isnan(x) else round(float(x), 3)
+
+
+def _breakdown(labels: np.ndarray, codes: np.ndarray, scores: np.ndarray, session_index: np.ndarray,
+               key: str) -> List[Dict]:
+    groups = len(labels)
+    stats = _group_stats(codes, scores, groups)
+    sessions = _distinct_sessions(codes, session_index, groups)
+    passed = np.bincount(codes, weights=(scores >= 5.0).astype(np.float64), minlength=groups)
+    return [
+        {
+            key: str(labels[i]),
+            'answers': int(stats['count'][i]),
+            'sessions': int(sessions[i]),
+            'average_score': _value(stats['mean'][i]),
+            'stddev': _value(stats['std'][i]),
+            'pass_rate': _value(passed[i] / stats['count'][i])
+        }
+        for i in range(groups) if stats['count'][i]
+    ]
+
+
+@versioned_cache()
+def get_analytics(chunk_size: int = ANALYTICS_CHUNK_SIZE, db_path: str = None) -> Dict:
+    """
+    Score breakdowns by topic, question, level and week. by_question also
+    carries difficulty and discrimination for items with at least
+    ANALYTICS_MIN_RESPONSES scored answers, hardest first.
+    """
+    data = load_columns(chunk_size, db_path)
+    scores = data['scores']
+    session_index = data['answer_session']
+
+    # Per-answer rest score: the mean of the other answers in the same session
+    session_count = np.bincount(session_index, minlength=len(data['session_ids']))
+    session_sum = np.bincount(session_index, weights=scores, minlength=len(data['session_ids']))
+    others = session_count[session_index] - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rest = np.where(others > 0, (session_sum[session_index] - scores) / others, np.nan)
+
+    question_labels, question_codes = np.unique(data['question_ids'], return_inverse=True)
+    bank_topics = _bank_topics()
+    texts = [data['question_text'].get(int(qid)) or '' for qid in question_labels]
+    question_topics = np.array([bank_topics.get(text, AI_GENERATED_TOPIC) for text in texts], dtype=object)
+
+    topic_labels, topic_of_question = np.unique(question_topics.astype(str), return_inverse=True)
+    by_topic = _breakdown(topic_labels, topic_of_question[question_codes], scores, session_index, 'topic')
+
+    level_labels, level_codes = np.unique(data['levels'], return_inverse=True)
+    by_level = _breakdown(level_labels, level_codes[session_index], scores, session_index, 'level')
+
+    started = data['started'][session_index]
+    dated = started >= 0
+    week_numbers = (started[dated] + WEEK_OFFSET_SECONDS) // WEEK_SECONDS
+    week_keys, week_codes = np.unique(week_numbers, return_inverse=True)
+    week_labels = np.array([
+        datetime.fromtimestamp(int(week) * WEEK_SECONDS - WEEK_OFFSET_SECONDS, timezone.utc).strftime('%Y-%m-%d')
+        for week in week_keys
+    ])
+    by_week = _breakdown(week_labels, week_codes, scores[dated], session_index[dated], 'week')
+
+    groups = len(question_labels)
+    stats = _group_stats(question_codes, scores, groups)
+    paired = ~np.isnan(rest)
+    discrimination = _group_correlation(question_codes[paired], scores[paired], rest[paired], groups)
+    by_question = []
+    for i in range(groups):
+        enough = stats['count'][i] >= ANALYTICS_MIN_RESPONSES
+        in_bank = question_topics[i] != AI_GENERATED_TOPIC
+        by_question.append({
+            'question_id': int(question_labels[i]),
+            'question': texts[i],
+            'topic': question_topics[i],
+            'answers': int(stats['count'][i]),
+            'average_score': _value(stats['mean'][i]),
+            'stddev': _value(stats['std'][i]),
+            'difficulty': _value(stats['mean'][i] / 10) if enough and in_bank else None,
+            'discrimination': _value(discrimination[i]) if enough and in_bank else None
+        })
+    by_question.sort(key=lambda row: (row['difficulty'] is None, row['difficulty'] or 0, -row['answers']))
+
+    return {
+        'answers': int(len(scores)),
+        'sessions': int(np.count_nonzero(session_count)),
+        'by_topic': by_topic,
+        'by_level': by_level,
+        'by_week': by_week,
+        'by_question': by_question
+    }
+
+
+def _print_table(title: str, rows: List[Dict], columns: List[str]):
+    print(f"\n{title}")
+    print("  " + "  ".join(f"{column:>14}" for column in columns))
+    for row in rows:
+        print("  " + "  ".join(f"{str(row[column])[:14]:>14}" for column in columns))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score analytics by topic, question, level and week.")
+    parser.add_argument('--db', default=database.DB_PATH, help="Path to the interview history database")
+    parser.add_argument('--top', type=int, default=10, help="Questions to list (hardest first)")
+    parser.add_argument('--output', help="Also write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    report = get_analytics(db_path=args.db)
+    print(f"{report['answers']} answers in {report['sessions']} sessions, "
+          f"analysed in {time.perf_counter() - t0:.2f}s")
+    _print_table("By topic", report['by_topic'], ['topic', 'answers', 'average_score', 'pass_rate'])
+    _print_table("By level", report['by_level'], ['level', 'answers', 'average_score', 'pass_rate'])
+    _print_table("By week (last 12)", report['by_week'][-12:], ['week', 'answers', 'sessions', 'average_score'])
+    _print_table("Hardest questions", report['by_question'][:args.top],
+                 ['question', 'topic', 'answers', 'difficulty', 'discrimination'])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Loader for stored answer embeddings.
+Vectors saved by database.store_embedding are exported once per filter to a
+.npy file in EMBEDDING_CACHE_DIR and memory-mapped from there, so analytics
+jobs get a float16 matrix without re-running the transformer or holding a
+second copy in RAM. The cache file is rebuilt whenever the matching
+embeddings change.
+"""
+
+import glob
+import hashlib
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import EMBEDDING_MODEL, EMBEDDING_CACHE_DIR
+from database import get_connection, _await_pending_writes
+
+CHUNK_SIZE = 5000
+
+
+def _filter_clause(role: Optional[str], question: Optional[str]) -> Tuple[str, list]:
+    conditions = ['e.model = ?']
+    params = [EMBEDDING_MODEL]
+    if role is not None:
+        conditions.append('s.role = ?')
+        params.append(role)
+    if question is not None:
+        conditions.append('q.question = ?')
+        params.append(question)
+    return ' AND '.join(conditions), params
+
+
+def _cache_prefix(cache_dir: str, role: Optional[str], question: Optional[str]) -> str:
+    key = f"{EMBEDDING_MODEL}\0{role}\0{question}"
+    return os.path.join(cache_dir, f"embeddings-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}")
+
+
+def _remove_stale(prefix: str, keep: Tuple[str, ...]):
+    for path in glob.glob(prefix + '-*.npy'):
+        if path not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                # Still mapped by another reader (Windows); removed on a later run
+                pass
+
+
+def load_embeddings(role: str = None, question: str = None, db_path: str = None,
+                    cache_dir: str = EMBEDDING_CACHE_DIR) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stored embeddings for answers in sessions of role and/or to question,
+    ordered by answer_id. Returns (answer_ids, matrix); matrix is a read-only
+    float16 memmap of shape (len(answer_ids), dim).
+    """
+    _await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
+    where, params = _filter_clause(role, question)
+    source = f'''
+        FROM answer_embeddings e
+        JOIN answers a ON a.answer_id = e.answer_id
+        JOIN sessions s ON s.session_id = a.session_id
+        LEFT JOIN questions q ON q.question_id = a.question_id
+        WHERE {where}
+    '''
+
+    # One read transaction, so the rows exported match the counted snapshot
+    conn.execute('BEGIN')
+    try:
+        count, version, dim = conn.execute(
+            f'SELECT COUNT(*), COALESCE(MAX(e.embedding_id), 0), COALESCE(MAX(e.dim), 0) {source}', params
+        ).fetchone()
+        if count == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float16)
+
+        prefix = _cache_prefix(cache_dir, role, question)
+        path = f'{prefix}-{count}-{version}-{dim}.npy'
+        ids_path = f'{prefix}-{count}-{version}-{dim}-ids.npy'
+        if not (os.path.exists(path) and os.path.exists(ids_path)):
+            _export(conn, source, params, count, dim, path, ids_path, cache_dir)
+            _remove_stale(prefix, (path, ids_path))
+    finally:
+        conn.execute('COMMIT')
+
+    return np.load(ids_path), np.load(path, mmap_mode='r')
+
+
+def _export(conn, source: str, params: list, count: int, dim: int, path: str, ids_path: str, cache_dir: str):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written under temporary names and renamed, so a reader never maps a
+    # half-written file
+    tmp_path, tmp_ids_path = path + '.tmp', ids_path + '.tmp'
+    matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float16, shape=(count, dim))
+    answer_ids = np.empty(count, dtype=np.int64)
+
+    cursor = conn.execute(f'SELECT e.answer_id, e.vector {source} ORDER BY e.answer_id', params)
+    row = 0
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            break
+        for answer_id, vector in rows:
+            answer_ids[row] = answer_id
+            matrix[row] = np.frombuffer(vector, dtype=np.float16)
+            row += 1
+    matrix.flush()
+    del matrix
+
+    with open(tmp_ids_path, 'wb') as f:
+        np.save(f, answer_ids)
+    os.replace(tmp_path, path)
+    os.replace(tmp_ids_path, ids_path)
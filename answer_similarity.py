@@ -0,0 +1,214 @@
+"""
+Near-duplicate detection across stored answers.
+database.save_answer stores a MinHash signature of each answer's word
+shingles plus one LSH bucket row per band. An answer's look-alikes are the
+answers sharing at least one bucket with it, found with LSH_BANDS index
+lookups however many answers are stored, then checked against the
+signatures. `scan` finds every such pair in one pass over the bucket index,
+for the integrity review.
+
+Usage:
+    python answer_similarity.py index            # index answers saved before this feature
+    python answer_similarity.py scan --output duplicates.json
+    python answer_similarity.py similar 1234
+"""
+
+import argparse
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import database
+from config import DUPLICATE_THRESHOLD, LSH_MAX_BUCKET
+from database import get_connection, transaction, index_answer_minhash, lsh_buckets
+
+INDEX_CHUNK_SIZE = 2000
+SIGNATURE_CHUNK_SIZE = 5000
+
+
+def index_answers(chunk_size: int = INDEX_CHUNK_SIZE, db_path: str = None) -> int:
+    """Add signatures for stored answers that have none yet. Returns how many were indexed."""
+    database._await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
+    last_id, indexed = 0, 0
+    while True:
+        rows = conn.execute('''
+            SELECT a.answer_id, a.user_answer
+            FROM answer_texts a
+            LEFT JOIN answer_minhash m ON m.answer_id = a.answer_id
+            WHERE a.answer_id > ? AND m.answer_id IS NULL
+            ORDER BY a.answer_id
+            LIMIT ?
+        ''', (last_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        with transaction(conn):
+            indexed += sum(index_answer_minhash(conn, answer_id, text) for answer_id, text in rows)
+        last_id = rows[-1][0]
+        print(f"Indexed {indexed} answers (up to answer {last_id})")
+    return indexed
+
+
+def _signatures(conn, answer_ids: List[int]) -> Dict[int, tuple]:
+    """answer_id -> (signature, session_id) for the given answers."""
+    found = {}
+    for start in range(0, len(answer_ids), SIGNATURE_CHUNK_SIZE):
+        for answer_id, signature, session_id in conn.execute('''
+            SELECT m.answer_id, m.signature, a.session_id
+            FROM answer_minhash m
+            JOIN answers a ON a.answer_id = m.answer_id
+            WHERE m.answer_id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(answer_ids[start:start + SIGNATURE_CHUNK_SIZE]),)):
+            found[answer_id] = (np.frombuffer(signature, dtype=np.uint32), session_id)
+    return found
+
+
+def find_similar_answers(answer_id: int, threshold: float = DUPLICATE_THRESHOLD,
+                         include_same_session: bool = False, limit: int = 20, db_path: str = None) -> List[Dict]:
+    """
+    Stored answers whose estimated Jaccard similarity to answer_id is at
+    least threshold, most similar first. Answers from the same session are
+    left out unless include_same_session is set. As in scan_duplicates,
+    buckets holding more than LSH_MAX_BUCKET answers are skipped.
+    """
+    database._await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
+    own = _signatures(conn, [answer_id]).get(answer_id)
+    if own is None:
+        return []
+    signature, session_id = own
+
+    # One primary-key range read per band, stopping one row past the cap so
+    # an oversized bucket costs LSH_MAX_BUCKET rows rather than its full size
+    candidate_ids = set()
+    for band, bucket in lsh_buckets(signature):
+        members = [row[0] for row in conn.execute(
+            'SELECT answer_id FROM answer_lsh WHERE band = ? AND bucket = ? LIMIT ?',
+            (band, bucket, LSH_MAX_BUCKET + 1)
+        )]
+        if len(members) <= LSH_MAX_BUCKET:
+            candidate_ids.update(members)
+    candidate_ids.discard(answer_id)
+    candidates = _signatures(conn, sorted(candidate_ids))
+
+    matches = []
+    for other_id, (other_signature, other_session) in candidates.items():
+        if other_session == session_id and not include_same_session:
+            continue
+        similarity = float(np.mean(signature == other_signature))
+        if similarity >= threshold:
+            matches.append((similarity, other_id))
+    matches.sort(reverse=True)
+    matches = matches[:limit]
+    if not matches:
+        return []
+
+    details = {row[0]: row[1:] for row in conn.execute('''
+        SELECT a.answer_id, a.session_id, a.question_number, s.role, s.start_time
+        FROM answers a
+        JOIN sessions s ON s.session_id = a.session_id
+        WHERE a.answer_id IN (SELECT value FROM json_each(?))
+    ''', (json.dumps([other_id for _, other_id in matches]),))}
+    return [
+        {
+            'answer_id': other_id,
+            'session_id': details[other_id][0],
+            'question_number': details[other_id][1],
+            'role': details[other_id][2],
+            'start_time': details[other_id][3],
+            'similarity': round(similarity, 3)
+        }
+        for similarity, other_id in matches if other_id in details
+    ]
+
+
+def scan_duplicates(threshold: float = DUPLICATE_THRESHOLD, include_same_session: bool = False,
+                    db_path: str = None) -> List[Dict]:
+    """
+    Every pair of stored answers at or above threshold, most similar first.
+    Candidate pairs come from shared LSH buckets; buckets holding more than
+    LSH_MAX_BUCKET answers (boilerplate shared by many candidates) are
+    skipped.
+    """
+    database._await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
+    pairs = set()
+    skipped = 0
+    for members in conn.execute('''
+        SELECT GROUP_CONCAT(answer_id)
+        FROM answer_lsh
+        GROUP BY band, bucket
+        HAVING COUNT(*) > 1
+    '''):
+        ids = sorted(int(answer_id) for answer_id in members[0].split(','))
+        if len(ids) > LSH_MAX_BUCKET:
+            skipped += 1
+            continue
+        pairs.update((ids[i], ids[j]) for i in range(len(ids)) for j in range(i + 1, len(ids)))
+    if skipped:
+        print(f"Skipped {skipped} LSH buckets with more than {LSH_MAX_BUCKET} answers")
+    if not pairs:
+        return []
+
+    pairs = np.array(sorted(pairs), dtype=np.int64)
+    answer_ids = np.unique(pairs)
+    signatures = _signatures(conn, answer_ids.tolist())
+    matrix = np.stack([signatures[answer_id][0] for answer_id in answer_ids.tolist()])
+    sessions = np.array([signatures[answer_id][1] for answer_id in answer_ids.tolist()])
+    left = np.searchsorted(answer_ids, pairs[:, 0])
+    right = np.searchsorted(answer_ids, pairs[:, 1])
+
+    similarity = np.empty(len(pairs))
+    for start in range(0, len(pairs), SIGNATURE_CHUNK_SIZE):
+        end = start + SIGNATURE_CHUNK_SIZE
+        similarity[start:end] = (matrix[left[start:end]] == matrix[right[start:end]]).mean(axis=1)
+
+    keep = similarity >= threshold
+    if not include_same_session:
+        keep &= sessions[left] != sessions[right]
+    order = np.argsort(-similarity[keep], kind='stable')
+    return [
+        {
+            'answer_id': int(answer_ids[l]),
+            'session_id': int(sessions[l]),
+            'other_answer_id': int(answer_ids[r]),
+            'other_session_id': int(sessions[r]),
+            'similarity': round(float(s), 3)
+        }
+        for l, r, s in zip(left[keep][order], right[keep][order], similarity[keep][order])
+    ]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate answers across interview sessions.")
+    parser.add_argument('command', choices=['index', 'scan', 'similar'])
+    parser.add_argument('answer_id', nargs='?', type=int, help="similar: the answer to look up")
+    parser.add_argument('--db', default=database.DB_PATH, help="Path to the interview history database")
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD, help="Minimum estimated Jaccard similarity")
+    parser.add_argument('--same-session', action='store_true', help="Also report pairs within one session")
+    parser.add_argument('--output', help="scan: write the pairs to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.command == 'index':
+        print(f"Done: {index_answers(db_path=args.db)} answers indexed")
+    elif args.command == 'similar':
+        if args.answer_id is None:
+            parser.error("similar needs an answer_id")
+        for match in find_similar_answers(args.answer_id, args.threshold, args.same_session, db_path=args.db):
+            print(f"answer {match['answer_id']} (session {match['session_id']}, {match['role']}, "
+                  f"{match['start_time']}): {match['similarity']:.0%} similar")
+    else:
+        duplicates = scan_duplicates(args.threshold, args.same_session, db_path=args.db)
+        print(f"Found {len(duplicates)} near-duplicate pairs at similarity >= {args.threshold}")
+        for pair in duplicates[:20]:
+            print(f"  answers {pair['answer_id']} / {pair['other_answer_id']} "
+                  f"(sessions {pair['session_id']} / {pair['other_session_id']}): {pair['similarity']:.0%}")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(duplicates, f, indent=2)
+            print(f"Pairs written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
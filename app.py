@@ -13,7 +13,7 @@ from interview_engine import (
     generate_interview_questions,
     get_total_questions
 )
-from evaluation import evaluate_answer, calculate_interview_summary
+from evaluation import evaluate_answer_cascade, calculate_interview_summary
 from speechtotext import transcribe_audio
 from text_to_speech import text_to_speech
 from audio_recorder import save_recorded_audio, cleanup_audio_file
@@ -23,15 +23,11 @@ try:
 except ImportError:
     AUDIO_RECORDER_AVAILABLE = False
     print("Warning: audio-recorder-streamlit not installed. Voice recording will be disabled.")
-from database import (
-    create_session,
-    save_answer,
-    complete_session,
-    get_session_history,
-    get_session_details,
-    get_statistics,
-    export_session_to_text
-)
+from storage import get_storage
+from database import set_tenant
+from config import DEFAULT_TENANT
+
+storage = get_storage()
 
 st.set_page_config(
     page_title="AI Interview Agent",
@@ -40,6 +36,14 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# One tenant per deployment, from TENANT_ID. Never taken from the URL: any
+# visitor could otherwise open another organisation's history
+try:
+    set_tenant(DEFAULT_TENANT)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+
 st.markdown("""
 <style>
     .main-header {
@@ -128,6 +132,8 @@ if 'total_questions' not in st.session_state:
     st.session_state.total_questions = 5
 if 'current_question' not in st.session_state:
     st.session_state.current_question = None
+if 'shown_questions' not in st.session_state:
+    st.session_state.shown_questions = []
 if 'voice_enabled' not in st.session_state:
     st.session_state.voice_enabled = True
 if 'question_start_time' not in st.session_state:
@@ -154,6 +160,7 @@ def reset_interview():
     st.session_state.session_id = None
     st.session_state.all_qa_data = []
     st.session_state.current_question = None
+    st.session_state.shown_questions = []
     st.session_state.question_start_time = None
     st.session_state.answer_submitted = False
     st.session_state.current_evaluation = None
@@ -175,20 +182,23 @@ def start_interview(role, level, num_questions, voice_enabled, time_limit):
     st.session_state.session_time_limit = time_limit * 60 if time_limit > 0 else None
     st.session_state.timer_expired = False
     
-    st.session_state.session_id = create_session(role, level)
+    st.session_state.session_id = storage.create_session(role, level)
     
-    question_data = generate_question(role, level, 0, use_ai=st.session_state.use_ai_questions)
+    question_data = generate_question(role, level, 0, use_ai=st.session_state.use_ai_questions, asked=[])
     st.session_state.current_question = question_data
+    st.session_state.shown_questions = [question_data]
 
 def process_answer(user_answer, question_data):
-    evaluation = evaluate_answer(
+    evaluation = evaluate_answer_cascade(
         user_answer,
         question_data['ideal_answer'],
         question_data['question'],
-        question_data
+        question_data,
+        role=st.session_state.role,
+        level=st.session_state.level
     )
     
-    save_answer(
+    storage.save_answer_deferred(
         st.session_state.session_id,
         st.session_state.current_question_num + 1,
         question_data['question'],
@@ -215,17 +225,22 @@ def next_question():
     st.session_state.answer_submitted = False
     st.session_state.current_evaluation = None
     
-    if st.session_state.current_question_num < st.session_state.total_questions:
+    if st.session_state.current_question_num < len(st.session_state.shown_questions):
+        # Moving forward again after going back
+        st.session_state.current_question = st.session_state.shown_questions[st.session_state.current_question_num]
+    elif st.session_state.current_question_num < st.session_state.total_questions:
         question_data = generate_question(
             st.session_state.role,
             st.session_state.level,
             st.session_state.current_question_num,
-            use_ai=st.session_state.use_ai_questions
+            use_ai=st.session_state.use_ai_questions,
+            asked=[(qa['question'], qa['evaluation'].get('score')) for qa in st.session_state.all_qa_data]
         )
         st.session_state.current_question = question_data
+        st.session_state.shown_questions.append(question_data)
     else:
         avg_score = sum(st.session_state.scores) / len(st.session_state.scores)
-        complete_session(
+        storage.complete_session_deferred(
             st.session_state.session_id,
             avg_score,
             st.session_state.total_questions
@@ -236,12 +251,7 @@ def previous_question():
     if st.session_state.current_question_num > 0:
         st.session_state.current_question_num -= 1
         st.session_state.question_start_time = time.time()
-        question_data = generate_question(
-            st.session_state.role,
-            st.session_state.level,
-            st.session_state.current_question_num
-        )
-        st.session_state.current_question = question_data
+        st.session_state.current_question = st.session_state.shown_questions[st.session_state.current_question_num]
 
 st.markdown('<div class="main-header">AI Interview Agent</div>', unsafe_allow_html=True)
 st.markdown('<p style="text-align: center; font-size: 1.1rem; color: #666; margin-top: -10px;">Your Personal AI-Powered Interview Coach | Practice, Learn, Excel</p>', unsafe_allow_html=True)
@@ -408,7 +418,7 @@ elif st.session_state.page == "Interview":
                     st.session_state.timer_expired = True
                     if st.session_state.scores:
                         avg_score = sum(st.session_state.scores) / len(st.session_state.scores)
-                        complete_session(
+                        storage.complete_session_deferred(
                             st.session_state.session_id,
                             avg_score,
                             len(st.session_state.scores)
@@ -516,6 +526,8 @@ elif st.session_state.page == "Interview":
                     
                     score_class = "score-excellent" if evaluation['score'] >= 8 else "score-average" if evaluation['score'] >= 5 else "score-poor"
                     st.markdown(f'<div class="{score_class}">Score: {evaluation["score"]}/10 ({evaluation["category"]})</div>', unsafe_allow_html=True)
+                    if evaluation.get('stage'):
+                        st.caption(f"Scored by: {evaluation['stage']} stage")
                     
                     col_fb1, col_fb2 = st.columns(2)
                     
@@ -640,7 +652,12 @@ elif st.session_state.page == "Interview":
             summary = calculate_interview_summary(
                 st.session_state.scores,
                 st.session_state.role,
-                st.session_state.level
+                st.session_state.level,
+                percentile=storage.get_score_percentile(
+                    sum(st.session_state.scores) / len(st.session_state.scores),
+                    st.session_state.role,
+                    st.session_state.level
+                ) if st.session_state.scores else None
             )
             
             col1, col2, col3, col4 = st.columns(4)
@@ -654,6 +671,12 @@ elif st.session_state.page == "Interview":
             with col4:
                 st.metric("Performance", summary['overall_performance'])
             
+            if summary['percentile'] is not None:
+                st.caption(
+                    f"Your average ranks at the {summary['percentile']:.0f}th percentile of "
+                    f"{st.session_state.role} ({st.session_state.level}) interviews."
+                )
+            
             st.markdown("---")
             col_break1, col_break2 = st.columns(2)
             
@@ -682,13 +705,12 @@ elif st.session_state.page == "Interview":
             
             with col_action1:
                 if st.button("Download Report", use_container_width=True):
-                    report_file = f"interview_report_{st.session_state.session_id}.txt"
-                    export_session_to_text(st.session_state.session_id, report_file)
-                    with open(report_file, 'r', encoding='utf-8') as f:
+                    report = storage.render_session_report(st.session_state.session_id)
+                    if report:
                         st.download_button(
                             "Download Text Report",
-                            f.read(),
-                            file_name=report_file,
+                            report,
+                            file_name=f"interview_report_{st.session_state.session_id}.txt",
                             mime="text/plain"
                         )
             
@@ -706,12 +728,59 @@ elif st.session_state.page == "Interview":
 elif st.session_state.page == "History":
     st.title("Interview History")
     
-    sessions = get_session_history(20)
+    if 'history_cursors' not in st.session_state:
+        st.session_state.history_cursors = [None]
+    if 'search_offset' not in st.session_state:
+        st.session_state.search_offset = 0
+    
+    col_query, col_role = st.columns([3, 1])
+    with col_query:
+        search_query = st.text_input("Search questions, answers and feedback", key="history_search")
+    with col_role:
+        search_role = st.selectbox("Role", ["All Roles", "Python Developer", "Data Scientist", "Web Developer"], key="history_search_role")
+    
+    if st.session_state.get('last_search') != (search_query, search_role):
+        st.session_state.last_search = (search_query, search_role)
+        st.session_state.search_offset = 0
+    
+    if search_query.strip():
+        results, next_offset = storage.search_answers(
+            search_query,
+            role=None if search_role == "All Roles" else search_role,
+            offset=st.session_state.search_offset,
+            page_size=20
+        )
+        
+        if not results and st.session_state.search_offset == 0:
+            st.info("No answers match your search.")
+        else:
+            st.markdown(f"### Search Results (page {st.session_state.search_offset // 20 + 1})")
+            for result in results:
+                st.markdown(f"**{result['role']} - {result['level']} | {result['start_time'][:16]} | Q{result['question_number']}:** {result['question']}")
+                st.markdown(f"> {result['snippet']}")
+                st.caption(f"Score: {result['score']}/10 ({result['category']})")
+                st.markdown("---")
+            
+            col_prev, col_next = st.columns(2)
+            with col_prev:
+                if st.button("Previous Results", use_container_width=True, disabled=st.session_state.search_offset == 0):
+                    st.session_state.search_offset = max(0, st.session_state.search_offset - 20)
+                    st.rerun()
+            with col_next:
+                if st.button("More Results", use_container_width=True, disabled=next_offset is None):
+                    st.session_state.search_offset = next_offset
+                    st.rerun()
+        st.stop()
+    
+    page_number = len(st.session_state.history_cursors)
+    sessions, next_cursor = storage.get_session_page(st.session_state.history_cursors[-1], page_size=20)
     
-    if not sessions:
+    if not sessions and page_number == 1:
         st.info("No interview history yet. Start your first interview!")
     else:
-        st.markdown(f"### Recent Sessions ({len(sessions)} total)")
+        st.markdown(f"### Recent Sessions (page {page_number})")
+        
+        details = storage.get_sessions_details([session['session_id'] for session in sessions], summaries=True)
         
         for session in sessions:
             with st.expander(f"{session['role']} - {session['level']} | {session['start_time'][:16]} | Score: {session['average_score']}/10"):
@@ -730,19 +799,28 @@ elif st.session_state.page == "History":
                     st.write(f"**Questions:** {session['total_questions']}")
                 
                 if st.button(f"View Details", key=f"details_{session['session_id']}"):
-                    details = get_session_details(session['session_id'])
                     st.markdown("#### Detailed Answers")
                     
-                    for answer in details['answers']:
-                        st.markdown(f"**Q{answer['question_number']}:** {answer['question']}")
-                        st.markdown(f"**Your Answer:** {answer['user_answer'][:200]}...")
-                        st.markdown(f"**Score:** {answer['score']}/10 ({answer['category']})")
+                    for answer in details[session['session_id']]['answers']:
+                        st.markdown(f"**Q{answer.question_number}:** {answer.question}")
+                        st.markdown(f"**Your Answer:** {answer.user_answer[:200]}...")
+                        st.markdown(f"**Score:** {answer.score}/10 ({answer.category})")
                         st.markdown("---")
+        
+        col_prev, col_next = st.columns(2)
+        with col_prev:
+            if st.button("Newer Sessions", use_container_width=True, disabled=page_number == 1):
+                st.session_state.history_cursors.pop()
+                st.rerun()
+        with col_next:
+            if st.button("Older Sessions", use_container_width=True, disabled=next_cursor is None):
+                st.session_state.history_cursors.append(next_cursor)
+                st.rerun()
 
 elif st.session_state.page == "Statistics":
     st.title("Overall Statistics")
     
-    stats = get_statistics()
+    stats = storage.get_statistics()
     
     if stats['total_completed_sessions'] == 0:
         st.info("No statistics available yet. Complete some interviews to see your progress!")
@@ -768,6 +846,66 @@ elif st.session_state.page == "Statistics":
                     sessions_text = f"{data.get('session_count', data.get('sessions_count', 0))} sessions"
                     st.write(f"Avg: {data['average_score']}/10 ({sessions_text})")
         
+        st.markdown("---")
+        st.markdown("### Score Percentiles")
+        
+        col_pct_role, col_pct_level = st.columns(2)
+        with col_pct_role:
+            pct_role = st.selectbox("Role", ["All Roles"] + list(stats['performance_by_role'].keys()), key="pct_role")
+        with col_pct_level:
+            pct_level = st.selectbox("Level", ["All Levels", "Easy", "Medium", "Hard"], key="pct_level")
+        pct_role = None if pct_role == "All Roles" else pct_role
+        pct_level = None if pct_level == "All Levels" else pct_level
+        
+        distribution = storage.get_score_distribution(pct_role, pct_level)
+        if distribution['sessions']:
+            quantiles = distribution['quantiles']
+            col_p25, col_p50, col_p75, col_p90 = st.columns(4)
+            col_p25.metric("25th percentile", f"{quantiles[25]}/10")
+            col_p50.metric("Median", f"{quantiles[50]}/10")
+            col_p75.metric("75th percentile", f"{quantiles[75]}/10")
+            col_p90.metric("90th percentile", f"{quantiles[90]}/10")
+            
+            check_score = st.slider("Where does a score rank?", 0.0, 10.0, 7.0, 0.1, key="pct_score")
+            rank = storage.get_score_percentile(check_score, pct_role, pct_level)
+            st.write(f"A score of {check_score:.1f} beats about {rank:.0f}% of {distribution['sessions']} scored interviews.")
+        else:
+            st.info("No scored interviews for this role and level yet.")
+        
+        st.markdown("---")
+        st.markdown("### Progress Over Time")
+        
+        col_bucket, col_chart_role = st.columns(2)
+        with col_bucket:
+            bucket = st.selectbox("Group by", ["day", "week", "month"], index=1, key="stats_bucket")
+        with col_chart_role:
+            chart_role = st.selectbox("Role", ["All Roles"] + list(stats['performance_by_role'].keys()), key="stats_role")
+        
+        series = storage.get_score_timeseries(
+            role=None if chart_role == "All Roles" else chart_role,
+            bucket=bucket
+        )
+        scored = [point for point in series if point['average_score'] is not None]
+        if scored:
+            st.line_chart(
+                {
+                    'Period': [point['period'] for point in scored],
+                    'Average': [point['average_score'] for point in scored],
+                    'Best': [point['max_score'] for point in scored],
+                    'Lowest': [point['min_score'] for point in scored]
+                },
+                x='Period',
+                y=['Average', 'Best', 'Lowest']
+            )
+            st.bar_chart(
+                {
+                    'Period': [point['period'] for point in series],
+                    'Interviews': [point['sessions'] for point in series]
+                },
+                x='Period',
+                y='Interviews'
+            )
+        
         st.markdown("---")
         st.info("Tip: Complete more interviews to get detailed analytics and track your improvement over time!")
 
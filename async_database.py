@@ -0,0 +1,76 @@
+"""
+Asyncio counterpart of the database API.
+Every call runs the synchronous function from database.py on dedicated DB
+threads, so results and semantics are identical while the event loop stays
+free to overlap DB I/O with LLM and inference work. Writes share a single
+thread (SQLite allows one writer at a time); reads use a small pool that can
+proceed concurrently under WAL.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import database
+
+READER_THREADS = 4
+
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+_read_executor = ThreadPoolExecutor(max_workers=READER_THREADS, thread_name_prefix="db-read")
+
+
+async def _run(executor: ThreadPoolExecutor, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context over so database.tenant_scope applies on the DB thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, fn, *args, **kwargs))
+
+
+async def create_session(role: str, level: str) -> int:
+    return await _run(_write_executor, database.create_session, role, level)
+
+
+async def save_answer(session_id: int, question_number: int, question: str,
+                      user_answer: str, ideal_answer: str, evaluation: dict):
+    await _run(_write_executor, database.save_answer, session_id, question_number,
+               question, user_answer, ideal_answer, evaluation)
+
+
+async def complete_session(session_id: int, average_score: float, total_questions: int):
+    await _run(_write_executor, database.complete_session, session_id, average_score, total_questions)
+
+
+async def delete_session(session_id: int):
+    await _run(_write_executor, database.delete_session, session_id)
+
+
+async def get_session_history(limit: int = None) -> list:
+    return await _run(_read_executor, database.get_session_history, limit)
+
+
+async def get_session_page(cursor: Optional[Tuple[str, int]] = None, page_size: int = 20):
+    return await _run(_read_executor, database.get_session_page, cursor, page_size)
+
+
+async def get_session_details(session_id: int) -> Optional[Dict]:
+    return await _run(_read_executor, database.get_session_details, session_id)
+
+
+async def get_sessions_details(session_ids: List[int], summaries: bool = False) -> Dict[int, Dict]:
+    return await _run(_read_executor, database.get_sessions_details, session_ids, summaries)
+
+
+async def get_statistics() -> Dict:
+    return await _run(_read_executor, database.get_statistics)
+
+
+async def get_score_timeseries(role: str = None, level: str = None, since: str = None,
+                               until: str = None, bucket: str = 'day') -> List[Dict]:
+    return await _run(_read_executor, database.get_score_timeseries, role, level, since, until, bucket)
+
+
+def shutdown(wait: bool = True):
+    _write_executor.shutdown(wait=wait)
+    _read_executor.shutdown(wait=wait)
@@ -0,0 +1,250 @@
+"""
+Scaling benchmark for the history database.
+`generate` fills a database with synthetic sessions and answers built from
+the question bank; `run` measures the latency of the database.py API on it,
+optionally while other processes keep writing, and compares against a saved
+baseline the same way bench_evaluation.py does.
+
+Usage:
+    python bench_database.py generate --db bench.db --sessions 100000 --answers-per-session 10
+    python bench_database.py run --db bench.db --writers 4 --save-baseline db_base.json
+    python bench_database.py run --db bench.db --writers 4 --baseline db_base.json
+
+`run` adds a few sessions of its own and deletes them again when it finishes.
+Run it against a generated database, not your real history.
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+import database
+from config import SCORER_VERSION
+from bench_evaluation import SEED, measure, compare_to_baseline, print_results, _synthetic_answer
+
+ROLES = ["Python Developer", "Data Scientist", "Web Developer", "HR"]
+LEVELS = ["Easy", "Medium", "Hard"]
+SEARCH_TERMS = ["list python", "gradient descent", "http", "memory management", "overfitting"]
+GENERATE_CHUNK = 2000
+# Dimension of the default EMBEDDING_MODEL (all-MiniLM-L6-v2)
+EMBEDDING_DIM = 384
+
+
+def _question_pool() -> List[dict]:
+    from interview_engine import QUESTION_BANK, HR_QUESTIONS
+
+    pool = [q for levels in QUESTION_BANK.values() for qs in levels.values() for q in qs]
+    pool += [q for qs in HR_QUESTIONS.values() for q in qs]
+    return pool
+
+
+def generate(db_path: str, sessions: int, answers_per_session: int, days: int = 730, seed: int = SEED) -> dict:
+    """
+    Append synthetic completed sessions spread over the last `days` days.
+    Answers are stored through the same path as save_answer, with a random
+    embedding, so the similarity and embedding tables grow with the history.
+    Rows are inserted in large transactions, then the statistics are rebuilt
+    once.
+    """
+    rng = random.Random(seed)
+    vectors = np.random.default_rng(seed)
+    conn = database.get_connection(db_path)
+    pool = _question_pool()
+    start = datetime.now() - timedelta(days=days)
+
+    t0 = time.perf_counter()
+    created = 0
+    answers_written = 0
+    while created < sessions:
+        batch = min(GENERATE_CHUNK, sessions - created)
+        with database.transaction(conn):
+            for _ in range(batch):
+                started = start + timedelta(seconds=rng.randint(0, days * 86400))
+                count = max(1, int(rng.gauss(answers_per_session, answers_per_session / 4)))
+                scores = [round(min(10.0, max(0.0, rng.gauss(6.0, 2.0))), 1) for _ in range(count)]
+                cursor = conn.execute('''
+                    INSERT INTO sessions (role, level, start_time, end_time, average_score, total_questions, status)
+                    VALUES (?, ?, ?, ?, ?, ?, 'completed')
+                ''', (
+                    rng.choice(ROLES),
+                    rng.choice(LEVELS),
+                    started.strftime('%Y-%m-%d %H:%M:%S'),
+                    (started + timedelta(minutes=rng.randint(5, 60))).strftime('%Y-%m-%d %H:%M:%S'),
+                    sum(scores) / len(scores),
+                    count
+                ))
+                session_id = cursor.lastrowid
+
+                for number, score in enumerate(scores, start=1):
+                    k = rng.randrange(len(pool))
+                    answer = _synthetic_answer(rng, pool[k].get('ideal_answer') or pool[k]['question'], rng.choice([15, 40, 80, 200]))
+                    embedding = vectors.standard_normal(EMBEDDING_DIM)
+                    evaluation = {
+                        'score': score,
+                        'feedback': rng.choice(["Excellent answer!", "Good answer, but incomplete.", "Needs improvement."]),
+                        'what_was_good': _synthetic_answer(rng, pool[k]['question'], 12),
+                        'what_was_missing': _synthetic_answer(rng, pool[k].get('ideal_answer') or '', 15),
+                        'how_to_improve': "Add concrete examples and discuss trade-offs.",
+                        'scorer_version': SCORER_VERSION,
+                        'stage': 'embedding',
+                        'embedding': embedding / np.linalg.norm(embedding)
+                    }
+                    database._insert_answer(conn, session_id, number, pool[k]['question'], answer,
+                                            pool[k].get('ideal_answer', ''), evaluation)
+                answers_written += len(scores)
+        created += batch
+        elapsed = time.perf_counter() - t0
+        print(f"Generated {created}/{sessions} sessions, {answers_written} answers ({created / elapsed:.0f} sessions/s)")
+
+    database.rebuild_statistics(db_path)
+    return {'sessions': created, 'answers': answers_written, 'seconds': round(time.perf_counter() - t0, 1)}
+
+
+def _writer(db_path: str, stop, seed: int):
+    rng = random.Random(seed)
+    session_id = database.create_session("Benchmark Writer", "Easy", db_path=db_path)
+    number = 0
+    while not stop.is_set():
+        number += 1
+        database.save_answer(session_id, number, "Benchmark question", _synthetic_answer(rng, "benchmark answer text", 40),
+                             "benchmark ideal answer", {'score': rng.uniform(0, 10), 'feedback': 'benchmark'},
+                             db_path=db_path)
+        if number % 10 == 0:
+            database.complete_session(session_id, 5.0, number, db_path=db_path)
+            session_id = database.create_session("Benchmark Writer", "Easy", db_path=db_path)
+            number = 0
+
+
+def run_benchmarks(db_path: str, samples: int = 200, writers: int = 0) -> dict:
+    from answer_similarity import find_similar_answers
+
+    conn = database.get_connection(db_path)
+    rng = random.Random(SEED)
+
+    max_id = conn.execute('SELECT MAX(session_id) FROM sessions').fetchone()[0] or 0
+    if max_id == 0:
+        raise SystemExit(f"{db_path} has no sessions; run `generate` first")
+    session_ids = [rng.randint(1, max_id) for _ in range(samples)]
+    start_times = [row[0] for row in conn.execute(
+        'SELECT start_time FROM sessions ORDER BY RANDOM() LIMIT ?', (samples,)
+    )]
+    cursors = [(start_time, max_id + 1) for start_time in start_times]
+    id_batches = [[rng.randint(1, max_id) for _ in range(20)] for _ in range(samples)]
+    max_answer_id = conn.execute('SELECT MAX(answer_id) FROM answers').fetchone()[0] or 0
+    answer_ids = [rng.randint(1, max_answer_id) for _ in range(samples)]
+
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=_writer, args=(db_path, stop, SEED + i), daemon=True)
+        for i in range(writers)
+    ]
+    for process in processes:
+        process.start()
+
+    # Time the queries themselves, not the versioned read cache in front of them
+    history = database.get_session_history.__wrapped__
+    page = database.get_session_page.__wrapped__
+    details = database.get_session_details.__wrapped__
+    statistics = database.get_statistics.__wrapped__
+    timeseries = database.get_score_timeseries.__wrapped__
+
+    bench_session = database.create_session("Benchmark", "Easy", db_path=db_path)
+    answer_numbers = iter(range(1, 10 ** 9))
+    try:
+        results = {}
+        results["get_session_history[50]"] = measure(lambda _: history(50, db_path=db_path), range(samples))
+        results["get_session_page[first]"] = measure(lambda _: page(None, 20, db_path=db_path), range(samples))
+        results["get_session_page[deep]"] = measure(lambda c: page(c, 20, db_path=db_path), cursors)
+        results["get_session_details"] = measure(lambda session_id: details(session_id, db_path=db_path), session_ids)
+        results["get_sessions_details[20,summaries]"] = measure(
+            lambda ids: database.get_sessions_details(ids, summaries=True, db_path=db_path), id_batches
+        )
+        results["get_statistics"] = measure(lambda _: statistics(db_path=db_path), range(samples))
+        results["get_score_timeseries[month]"] = measure(
+            lambda _: timeseries(bucket='month', db_path=db_path), range(samples)
+        )
+        results["search_answers"] = measure(
+            lambda term: database.search_answers(term, db_path=db_path),
+            [SEARCH_TERMS[i % len(SEARCH_TERMS)] for i in range(samples)]
+        )
+        results["find_similar_answers"] = measure(
+            lambda answer_id: find_similar_answers(answer_id, db_path=db_path), answer_ids
+        )
+        results["save_answer"] = measure(
+            lambda _: database.save_answer(bench_session, next(answer_numbers), "Benchmark question",
+                                           "benchmark answer " * 20, "benchmark ideal answer",
+                                           {'score': 5.0, 'feedback': 'benchmark'}, db_path=db_path),
+            range(samples)
+        )
+        results["complete_session"] = measure(
+            lambda _: database.complete_session(bench_session, 5.0, samples, db_path=db_path), range(samples)
+        )
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+
+    # Remove everything the benchmark wrote
+    for (session_id,) in conn.execute(
+        "SELECT session_id FROM sessions WHERE role IN ('Benchmark', 'Benchmark Writer')"
+    ).fetchall():
+        database.delete_session(session_id, db_path=db_path)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic history and benchmark database.py.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    gen = subparsers.add_parser('generate', help="Fill a database with synthetic sessions")
+    gen.add_argument('--db', required=True, help="Database file to create or extend")
+    gen.add_argument('--sessions', type=int, default=10000, help="Sessions to add")
+    gen.add_argument('--answers-per-session', type=int, default=10, help="Average answers per session")
+    gen.add_argument('--days', type=int, default=730, help="Spread start times over this many past days")
+    gen.add_argument('--seed', type=int, default=SEED, help="Random seed")
+
+    bench = subparsers.add_parser('run', help="Measure database.py latency")
+    bench.add_argument('--db', required=True, help="Generated database to benchmark")
+    bench.add_argument('--samples', type=int, default=200, help="Calls per benchmark")
+    bench.add_argument('--writers', type=int, default=0, help="Concurrent writer processes during the run")
+    bench.add_argument('--save-baseline', metavar='PATH', help="Write results to PATH as the new baseline")
+    bench.add_argument('--baseline', metavar='PATH', help="Compare against the baseline stored at PATH")
+    bench.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        stats = generate(args.db, args.sessions, args.answers_per_session, args.days, args.seed)
+        print(f"Done: {stats['sessions']} sessions, {stats['answers']} answers in {stats['seconds']}s")
+        return 0
+
+    results = run_benchmarks(args.db, args.samples, args.writers)
+    print(f"{args.db}, {args.writers} concurrent writers")
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
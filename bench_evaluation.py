@@ -0,0 +1,219 @@
+"""
+Micro-benchmarks for the answer evaluator.
+Runs evaluate_answer, evaluate_answers_batch, generate_feedback,
+extract_key_concepts and calculate_interview_summary over fixed synthetic
+corpora and reports latency percentiles, throughput and peak RSS.
+
+Usage:
+    python bench_evaluation.py                           # run and print results
+    python bench_evaluation.py --save-baseline base.json # store a baseline
+    python bench_evaluation.py --baseline base.json      # fail on regression
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; psutil, if installed, reports the peak there
+    resource = None
+
+SEED = 1234
+FILLER_WORDS = ["basically", "so", "we", "then", "also", "usually", "because", "when", "which", "really"]
+CONNECTIVES = ["For example,", "However,", "Additionally,", "First,", "Finally,", "Such as"]
+
+
+def _ideal_answers() -> List[dict]:
+    from interview_engine import QUESTION_BANK
+
+    return [q for levels in QUESTION_BANK.values() for qs in levels.values() for q in qs]
+
+
+def _synthetic_answer(rng: random.Random, ideal_answer: str, num_words: int) -> str:
+    vocabulary = ideal_answer.split()
+    words = []
+    while len(words) < num_words:
+        roll = rng.random()
+        if roll < 0.7:
+            words.append(rng.choice(vocabulary))
+        elif roll < 0.95:
+            words.append(rng.choice(FILLER_WORDS))
+        else:
+            words.append(rng.choice(CONNECTIVES))
+    return " ".join(words[:num_words])
+
+
+def build_corpora(size: int = 50) -> Dict[str, List[dict]]:
+    rng = random.Random(SEED)
+    questions = _ideal_answers()
+    corpora = {"mcq": [], "short": [], "medium": [], "long": []}
+    lengths = {"short": 15, "medium": 80, "long": 600}
+
+    for i in range(size):
+        q = questions[i % len(questions)]
+        corpora["mcq"].append({
+            "user_answer": rng.choice("ABCD"),
+            "ideal_answer": q["ideal_answer"],
+            "question": q["question"],
+            "question_data": q
+        })
+        for name, num_words in lengths.items():
+            corpora[name].append({
+                "user_answer": _synthetic_answer(rng, q["ideal_answer"], num_words),
+                "ideal_answer": q["ideal_answer"],
+                "question": q["question"],
+                "question_data": None
+            })
+    return corpora
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB, or None where it cannot be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def measure(fn: Callable, inputs: list, items_per_call: int = 1, warmup: int = 3, repeat: int = 1) -> dict:
+    for item in inputs[:warmup]:
+        fn(item)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            t0 = time.perf_counter()
+            fn(item)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    peak_rss = _peak_rss_mb()
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p90_ms": round(_percentile(latencies, 90), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "throughput_per_s": round(len(latencies) * items_per_call / total, 1) if total else 0.0,
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None
+    }
+
+
+def run_benchmarks(size: int = 50, batch_size: int = 32, repeat: int = 1) -> Dict[str, dict]:
+    from evaluation import (
+        evaluate_answer,
+        evaluate_answers_batch,
+        generate_feedback,
+        extract_key_concepts,
+        calculate_interview_summary
+    )
+
+    corpora = build_corpora(size)
+
+    def evaluate(item):
+        return evaluate_answer(item["user_answer"], item["ideal_answer"], item["question"], item["question_data"])
+
+    results = {}
+    for name in ("mcq", "short", "medium", "long"):
+        results[f"evaluate_answer[{name}]"] = measure(evaluate, corpora[name], repeat=repeat)
+
+    medium = corpora["medium"]
+    batches = [medium[i:i + batch_size] for i in range(0, len(medium), batch_size)]
+    results[f"evaluate_answers_batch[{batch_size}]"] = measure(
+        evaluate_answers_batch, batches, items_per_call=batch_size, warmup=1, repeat=repeat
+    )
+
+    results["generate_feedback[medium]"] = measure(
+        lambda item: generate_feedback(6.0, item["user_answer"], item["ideal_answer"], 0.6), medium, repeat=repeat
+    )
+    results["extract_key_concepts[long]"] = measure(
+        lambda item: extract_key_concepts(item["user_answer"]), corpora["long"], repeat=repeat
+    )
+
+    rng = random.Random(SEED)
+    score_lists = [[round(rng.uniform(0, 10), 1) for _ in range(rng.randint(3, 50))] for _ in range(size)]
+    results["calculate_interview_summary"] = measure(
+        lambda scores: calculate_interview_summary(scores, "Python Developer", "Medium"), score_lists, repeat=repeat
+    )
+    return results
+
+
+def compare_to_baseline(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p90_ms"):
+            limit = previous[metric] * (1 + tolerance)
+            if previous[metric] > 0 and current[metric] > limit:
+                regressions.append(f"{name} {metric}: {current[metric]:.3f} > {limit:.3f} (baseline {previous[metric]:.3f})")
+    return regressions
+
+
+def _format_rss(peak_rss_mb: Optional[float]) -> str:
+    return "n/a" if peak_rss_mb is None else f"{peak_rss_mb:.1f}"
+
+
+def print_results(results: Dict[str, dict]):
+    header = f"{'benchmark':40} {'calls':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'items/s':>10} {'RSS MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:40} {r['calls']:>6} {r['p50_ms']:>9.3f} {r['p90_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['throughput_per_s']:>10.1f} {_format_rss(r['peak_rss_mb']):>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the answer evaluator.")
+    parser.add_argument('--size', type=int, default=50, help="Answers per corpus")
+    parser.add_argument('--batch-size', type=int, default=32, help="Answers per evaluate_answers_batch call")
+    parser.add_argument('--repeat', type=int, default=1, help="Passes over each corpus")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Write results to PATH as the new baseline")
+    parser.add_argument('--baseline', metavar='PATH', help="Compare against the baseline stored at PATH")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.size, args.batch_size, args.repeat)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Concept coverage engine for answer evaluation.
+Key concepts of an ideal answer (single key terms plus multi-word technical
+phrases) are compiled once per ideal answer into a word-level Aho-Corasick
+automaton, so checking a candidate answer is a single linear pass over its
+tokens.
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'can', 'it', 'its', 'this', 'that', 'these', 'those'}
+
+TECHNICAL_TERMS = [
+    "list comprehension", "garbage collection", "reference counting", "memory management",
+    "global interpreter lock", "context manager", "virtual environment", "unit test",
+    "unit testing", "design pattern", "dependency injection", "object oriented",
+    "multiple inheritance", "method resolution order", "lambda function", "event loop",
+    "time complexity", "space complexity", "big o", "hash table", "linked list",
+    "binary search", "data structure", "data structures", "machine learning",
+    "deep learning", "neural network", "neural networks", "gradient descent",
+    "feature engineering", "feature selection", "cross validation", "decision tree",
+    "random forest", "support vector", "kernel trick", "linear regression",
+    "logistic regression", "bias variance", "overfitting and underfitting",
+    "training data", "test data", "missing values", "dimensionality reduction",
+    "principal component analysis", "rest api", "restful api", "http methods",
+    "status code", "status codes", "single page application", "virtual dom",
+    "server side rendering", "cross site scripting", "sql injection", "primary key",
+    "foreign key", "box model", "responsive design", "media queries", "local storage",
+    "star method", "problem solving", "team player", "career goals",
+]
+
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]+\b')
+
+
+def tokenize(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+class ConceptAutomaton:
+    """Word-level Aho-Corasick automaton over a fixed list of concepts."""
+
+    def __init__(self, concepts: List[Tuple[str, ...]]):
+        self.concepts = concepts
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+
+        for index, concept in enumerate(concepts):
+            state = 0
+            for word in concept:
+                next_state = self.goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][word] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.output[child].extend(self.output[self.fail[child]])
+
+    def scan(self, tokens: List[str]):
+        """Yield (end_position, concept_index) for every match in tokens."""
+        state = 0
+        for position, word in enumerate(tokens):
+            while state and word not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(word, 0)
+            for index in self.output[state]:
+                yield position, index
+
+
+_TERM_AUTOMATON = ConceptAutomaton([tuple(term.split()) for term in TECHNICAL_TERMS])
+
+
+def extract_concepts(text: str) -> List[str]:
+    """
+    Key concepts of a text in order of first appearance: multi-word technical
+    terms, then remaining non-stop words longer than three letters.
+    """
+    tokens = tokenize(text)
+    concepts = []
+    seen = set()
+    covered = [False] * len(tokens)
+
+    for end, index in _TERM_AUTOMATON.scan(tokens):
+        term = _TERM_AUTOMATON.concepts[index]
+        start = end - len(term) + 1
+        for position in range(start, end + 1):
+            covered[position] = True
+        phrase = " ".join(term)
+        if phrase not in seen:
+            seen.add(phrase)
+            concepts.append((start, phrase))
+
+    for position, word in enumerate(tokens):
+        if covered[position] or word in STOP_WORDS or len(word) <= 3 or word in seen:
+            continue
+        seen.add(word)
+        concepts.append((position, word))
+
+    concepts.sort(key=lambda item: item[0])
+    return [concept for _, concept in concepts]
+
+
+@lru_cache(maxsize=2048)
+def compile_concepts(ideal_answer: str) -> ConceptAutomaton:
+    return ConceptAutomaton([tuple(concept.split()) for concept in extract_concepts(ideal_answer)])
+
+
+def concept_coverage(ideal_answer: str, user_answer: str) -> dict:
+    automaton = compile_concepts(ideal_answer)
+    total = len(automaton.concepts)
+    if total == 0:
+        return {"coverage": 1.0, "matched": [], "missing": []}
+
+    found = [False] * total
+    for _, index in automaton.scan(tokenize(user_answer)):
+        found[index] = True
+
+    matched = []
+    missing = []
+    for index, concept in enumerate(automaton.concepts):
+        (matched if found[index] else missing).append(" ".join(concept))
+
+    return {
+        "coverage": len(matched) / total,
+        "matched": matched,
+        "missing": missing
+    }
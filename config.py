@@ -9,10 +9,12 @@ try:
     OPENAI_API_KEY = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY"))
     GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY", os.getenv("GEMINI_API_KEY"))
     HUGGINGFACE_API_KEY = st.secrets.get("HUGGINGFACE_API_KEY", os.getenv("HUGGINGFACE_API_KEY"))
+    TENANT_ID = st.secrets.get("TENANT_ID", os.getenv("TENANT_ID"))
 except:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
+    TENANT_ID = os.getenv("TENANT_ID")
 
 AI_PROVIDER = "gemini"
 OPENAI_MODEL = "gpt-3.5-turbo"
@@ -27,8 +29,102 @@ MAX_QUESTIONS = 50
 EXCELLENT_THRESHOLD = 8.0
 AVERAGE_THRESHOLD = 5.0
 
+# Bump whenever the scoring formula in evaluation.evaluate_answer changes,
+# then run `python rescore.py` to bring stored scores up to date.
+SCORER_VERSION = 2
+RESCORE_CHUNK_SIZE = 500
+RESCORE_WORKERS = 2
+
+# Share of the similarity score taken from ideal-answer concept coverage
+# (0 keeps scores purely embedding-based).
+CONCEPT_COVERAGE_WEIGHT = 0.0
+
+# Sentence-transformers model used for answer similarity. Stored answer
+# embeddings are tagged with it, so changing it invalidates them.
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_CACHE_DIR = "embedding_cache"
+
+# Answers longer than the embedding model's sequence limit are encoded as
+# overlapping token windows (at most ENCODING_MAX_WINDOWS, spread over the
+# whole answer) and mean-pooled into one embedding.
+ENCODING_WINDOW_OVERLAP = 32
+ENCODING_MAX_WINDOWS = 8
+
+# Cascaded scoring (evaluation.evaluate_answer_cascade). TF-IDF similarity is
+# calibrated separately from embedding similarity, so only the extremes are
+# settled without the embedding model: answers of at most
+# CASCADE_LEXICAL_REJECT_MAX_WORDS words sharing no content terms with the
+# ideal answer get CASCADE_LEXICAL_REJECT_SCORE, near-verbatim ones get
+# CASCADE_LEXICAL_ACCEPT_SCORE. With CASCADE_USE_LLM, embedding scores inside
+# the LLM band (0-10 scale) are escalated to the LLM evaluator; that is one
+# synchronous API call per escalated answer, so it is off by default.
+CASCADE_LEXICAL_REJECT = 0.0
+CASCADE_LEXICAL_ACCEPT = 0.9
+CASCADE_LEXICAL_REJECT_MAX_WORDS = 5
+CASCADE_LEXICAL_REJECT_SCORE = 1.0
+CASCADE_LEXICAL_ACCEPT_SCORE = 9.0
+CASCADE_LLM_BAND = (4.0, 6.0)
+CASCADE_USE_LLM = False
+
 DATABASE_PATH = "interview_history.db"
 
+# "sqlite" stores history in DATABASE_PATH; "postgres" uses POSTGRES_DSN so
+# several app nodes can share one history database.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+POSTGRES_DSN = os.getenv("POSTGRES_DSN", "postgresql://localhost/interview_agent")
+POSTGRES_POOL_MIN = 1
+POSTGRES_POOL_MAX = 10
+
+# Multi-tenant storage: each tenant's history lives in its own SQLite file in
+# TENANT_DATA_DIR. The app serves DEFAULT_TENANT, taken from TENANT_ID in the
+# secrets or environment and never from the request; unset, DATABASE_PATH is
+# used. Each thread keeps at most MAX_OPEN_SHARDS shard connections open, and
+# at most MAX_OPEN_SHARDS shards have a write-behind thread.
+DEFAULT_TENANT = TENANT_ID
+TENANT_DATA_DIR = "tenants"
+MAX_OPEN_SHARDS = 32
+
+# Results of the history and statistics reads kept in memory per process.
+# Entries are invalidated by any write to the database, not by age.
+READ_CACHE_SIZE = 256
+
+# Deferred answer and completion writes (database.save_answer_deferred and
+# complete_session_deferred). "normal" returns at once and a crash can lose
+# queued writes; "full" waits until the write is committed.
+WRITE_BEHIND_DURABILITY = "normal"
+
+# analytics.py reads history in chunks of ANALYTICS_CHUNK_SIZE rows; question
+# difficulty and discrimination need ANALYTICS_MIN_RESPONSES scored answers.
+ANALYTICS_CHUNK_SIZE = 50000
+ANALYTICS_MIN_RESPONSES = 5
+
+# Near-duplicate answer detection (answer_similarity.py). Answers are word
+# SHINGLE_SIZE-grams hashed into MINHASH_PERMUTATIONS MinHash values, split
+# into LSH_BANDS bands; pairs at or above DUPLICATE_THRESHOLD estimated
+# Jaccard similarity are reported. 32 bands of 4 rows catch pairs from about
+# 0.4 similarity. Answers shorter than MINHASH_MIN_TOKENS words are skipped.
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+MINHASH_MIN_TOKENS = 8
+DUPLICATE_THRESHOLD = 0.6
+LSH_MAX_BUCKET = 1000
+
+# Retrieval-based question selection (question_index.py), used instead of the
+# fixed static-bank order when AI questions are off or unavailable. The
+# QUESTION_SHORTLIST_SIZE questions nearest the candidate's weak areas are
+# re-ranked with a penalty of QUESTION_NOVELTY_WEIGHT times their similarity
+# to the closest question already asked.
+QUESTION_RETRIEVAL = True
+QUESTION_SHORTLIST_SIZE = 256
+QUESTION_NOVELTY_WEIGHT = 0.5
+
+# Retention job (retention.py): sessions started more than RETENTION_DAYS ago
+# are moved to gzip JSONL files in ARCHIVE_DIR and removed from the live DB.
+RETENTION_DAYS = 180
+ARCHIVE_DIR = "interview_archive"
+RETENTION_BATCH_SIZE = 100
+
 WHISPER_MODEL = "base"  # tiny, base, small, medium, large
 TTS_VOICE = "en-US-AriaNeural"
 
@@ -1,16 +1,175 @@
 import sqlite3
 import json
+import re
+import gzip
+import zlib
+import hashlib
+import csv
+import io
+import queue
+import threading
+import atexit
+import copy
+import functools
+import glob
+import heapq
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, NamedTuple, Tuple
 import os
 
-DB_PATH = "interview_history.db"
+import numpy as np
 
-def init_database():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+from config import (DATABASE_PATH, EMBEDDING_MODEL, TENANT_DATA_DIR, MAX_OPEN_SHARDS, READ_CACHE_SIZE,
+                    WRITE_BEHIND_DURABILITY, SHINGLE_SIZE, MINHASH_PERMUTATIONS, LSH_BANDS, MINHASH_MIN_TOKENS)
+
+DB_PATH = DATABASE_PATH
+
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 20000
+STATEMENT_CACHE_SIZE = 256
+# Text shorter than this is stored as-is; zlib would not make it smaller
+COMPRESS_MIN_BYTES = 64
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialized_paths = set()
+
+TENANT_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+_current_tenant: ContextVar[Optional[str]] = ContextVar('tenant', default=None)
+
+def set_tenant(tenant: Optional[str]):
+    """Route this thread's (or task's) database calls to tenant's shard; None means DB_PATH."""
+    if tenant is not None and not TENANT_KEY_PATTERN.match(tenant):
+        raise ValueError(f"Invalid tenant key: {tenant!r}")
+    return _current_tenant.set(tenant)
+
+@contextmanager
+def tenant_scope(tenant: Optional[str]):
+    token = set_tenant(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+def tenant_db_path(tenant: str) -> str:
+    return os.path.join(TENANT_DATA_DIR, f"{tenant}.db")
+
+def current_db_path() -> str:
+    tenant = _current_tenant.get()
+    return tenant_db_path(tenant) if tenant else DB_PATH
+
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    """
+    Return this thread's long-lived connection to db_path (the current
+    tenant's shard, or DB_PATH, by default), opening and tuning it on first
+    use. Each thread keeps at most MAX_OPEN_SHARDS connections, closing the
+    least recently used. Connections are never shared across threads or
+    inherited across fork.
+    """
+    db_path = db_path or current_db_path()
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.connections = OrderedDict()
+        _local.pid = os.getpid()
     
-    cursor.execute('''
+    conn = _local.connections.get(db_path)
+    if conn is None:
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = _connect(db_path)
+        _local.connections[db_path] = conn
+        _evict_connections()
+    else:
+        _local.connections.move_to_end(db_path)
+    return conn
+
+def _evict_connections():
+    idle = [path for path, conn in _local.connections.items() if not conn.in_transaction]
+    for path in idle[:max(0, len(_local.connections) - MAX_OPEN_SHARDS)]:
+        _local.connections.pop(path).close()
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    conn.create_function('decompress_text', 1, decompress_text, deterministic=True)
+    # Only takes effect on a new file; retention.py converts existing ones
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    
+    if db_path not in _initialized_paths:
+        with _schema_lock:
+            if db_path not in _initialized_paths:
+                _migrate(conn)
+                _initialized_paths.add(db_path)
+    
+    # Enabled after migrating: table rebuilds must run with foreign keys off
+    conn.execute('PRAGMA foreign_keys=ON')
+    return conn
+
+def compress_text(text: Optional[str]):
+    """Value to store for text: a zlib BLOB when that is smaller, otherwise the text itself."""
+    if text is None:
+        return None
+    encoded = text.encode('utf-8')
+    if len(encoded) < COMPRESS_MIN_BYTES:
+        return text
+    compressed = zlib.compress(encoded, 6)
+    return compressed if len(compressed) < len(encoded) else text
+
+def decompress_text(value):
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+def question_hash(question: str, ideal_answer: str) -> bytes:
+    return hashlib.sha1(f"{question or ''}\0{ideal_answer or ''}".encode('utf-8')).digest()
+
+def close_connections():
+    for conn in getattr(_local, 'connections', {}).values():
+        conn.close()
+    _local.connections = OrderedDict()
+
+@contextmanager
+def transaction(conn: sqlite3.Connection = None):
+    conn = conn or get_connection()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+def init_database():
+    _migrate(get_connection())
+
+def _migrate(conn: sqlite3.Connection):
+    """Apply every migration newer than the database's user_version, in order."""
+    for version, migration in MIGRATIONS:
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+            continue
+        with transaction(conn):
+            # Another process may have migrated while we waited for the lock
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                continue
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {version}')
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+def _migration_base_schema(conn: sqlite3.Connection):
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS sessions (
             session_id INTEGER PRIMARY KEY AUTOINCREMENT,
             role TEXT NOT NULL,
@@ -23,7 +182,7 @@ def init_database():
         )
     ''')
     
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS answers (
             answer_id INTEGER PRIMARY KEY AUTOINCREMENT,
             session_id INTEGER,
@@ -37,59 +196,429 @@ def init_database():
             FOREIGN KEY (session_id) REFERENCES sessions(session_id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
 
-def create_session(role: str, level: str) -> int:
-    init_database()
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def _migration_scorer_version(conn: sqlite3.Connection):
+    if 'scorer_version' not in _table_columns(conn, 'answers'):
+        conn.execute('ALTER TABLE answers ADD COLUMN scorer_version INTEGER')
+
+def _migration_history_indexes(conn: sqlite3.Connection):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answers_session ON answers(session_id, question_number)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_status_start ON sessions(status, start_time)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time)')
+
+def _migration_cascading_deletes(conn: sqlite3.Connection):
+    # SQLite cannot alter a foreign key in place, so rebuild the answers table
+    conn.execute('''
+        CREATE TABLE answers_new (
+            answer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER REFERENCES sessions(session_id) ON DELETE CASCADE,
+            question_number INTEGER,
+            question TEXT,
+            user_answer TEXT,
+            ideal_answer TEXT,
+            score REAL,
+            feedback TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            scorer_version INTEGER
+        )
+    ''')
+    columns = ', '.join(c for c in _table_columns(conn, 'answers') if c in _table_columns(conn, 'answers_new'))
+    conn.execute(f'INSERT INTO answers_new ({columns}) SELECT {columns} FROM answers')
+    conn.execute('DROP TABLE answers')
+    conn.execute('ALTER TABLE answers_new RENAME TO answers')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answers_session ON answers(session_id, question_number)')
+
+def _migration_statistics_aggregates(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            session_count INTEGER NOT NULL DEFAULT 0,
+            scored_count INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0,
+            next_seq INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stats_by_role (
+            role TEXT PRIMARY KEY,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            scored_count INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stats_recent_scores (
+            seq INTEGER PRIMARY KEY,
+            session_id INTEGER NOT NULL UNIQUE,
+            score REAL
+        )
+    ''')
+    _rebuild_statistics(conn)
+
+def _migration_history_keyset_index(conn: sqlite3.Connection):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_start_id ON sessions(start_time, session_id)')
+    conn.execute('DROP INDEX IF EXISTS idx_sessions_start')
+
+def _migration_archived_sessions(conn: sqlite3.Connection):
+    # Each archived session is one gzip member of archive_file, so it can be
+    # read back without decompressing the rest of the file
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archived_sessions (
+            session_id INTEGER PRIMARY KEY,
+            role TEXT NOT NULL,
+            level TEXT NOT NULL,
+            start_time TIMESTAMP,
+            status TEXT,
+            average_score REAL,
+            archive_file TEXT NOT NULL,
+            archive_offset INTEGER NOT NULL,
+            archive_length INTEGER NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _feedback_text_sql(column: str) -> str:
+    """SQL expression for the searchable text of a feedback JSON column."""
+    fields = " || ' ' || ".join(f"COALESCE(json_extract({column}, '$.{field}'), '')" for field in FEEDBACK_FIELDS)
+    return f"CASE WHEN json_valid({column}) THEN {fields} ELSE COALESCE({column}, '') END"
+
+def _migration_answer_search(conn: sqlite3.Connection):
+    # External-content FTS5 index: the text lives only in answers, the index
+    # is kept in step by triggers
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS answers_fts USING fts5(
+                question, user_answer, feedback_text,
+                content='answers_search_source', content_rowid='answer_id',
+                tokenize='porter unicode61'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Warning: answer search disabled, SQLite was built without FTS5 ({e})")
+        return
+    _create_answer_search_source(conn, 'answers', 'question, user_answer, feedback')
+    conn.execute("INSERT INTO answers_fts(answers_fts) VALUES ('rebuild')")
+
+def _create_answer_search_source(conn: sqlite3.Connection, relation: str, text_columns: str):
+    """
+    (Re)create the FTS content view over relation, which must expose
+    answer_id, question, user_answer and feedback as text, and the triggers
+    on answers that keep answers_fts in step. Old values are read through the
+    view in BEFORE triggers, so the triggers do not depend on how answers
+    stores its text.
+    """
+    conn.execute('DROP VIEW IF EXISTS answers_search_source')
+    conn.execute(f'''
+        CREATE VIEW answers_search_source AS
+        SELECT answer_id, question, user_answer, {_feedback_text_sql('feedback')} AS feedback_text
+        FROM {relation}
+    ''')
+    insert_new = '''
+        INSERT INTO answers_fts (rowid, question, user_answer, feedback_text)
+        SELECT answer_id, question, user_answer, feedback_text
+        FROM answers_search_source WHERE answer_id = new.answer_id;
+    '''
+    delete_old = '''
+        INSERT INTO answers_fts (answers_fts, rowid, question, user_answer, feedback_text)
+        SELECT 'delete', answer_id, question, user_answer, feedback_text
+        FROM answers_search_source WHERE answer_id = old.answer_id;
+    '''
+    for trigger in ('answers_fts_insert', 'answers_fts_delete', 'answers_fts_update', 'answers_fts_update_old'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute(f'CREATE TRIGGER answers_fts_insert AFTER INSERT ON answers BEGIN {insert_new} END')
+    conn.execute(f'CREATE TRIGGER answers_fts_delete BEFORE DELETE ON answers BEGIN {delete_old} END')
+    conn.execute(f'CREATE TRIGGER answers_fts_update_old BEFORE UPDATE OF {text_columns} ON answers BEGIN {delete_old} END')
+    conn.execute(f'CREATE TRIGGER answers_fts_update AFTER UPDATE OF {text_columns} ON answers BEGIN {insert_new} END')
+
+def _migration_normalized_answers(conn: sqlite3.Connection):
+    # Question text is stored once per distinct (question, ideal_answer) pair;
+    # long user answers and feedback are zlib-compressed BLOBs. answer_texts
+    # presents the old column layout with everything decompressed.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            question_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash BLOB NOT NULL UNIQUE,
+            question TEXT,
+            ideal_answer TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE answers_new (
+            answer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER REFERENCES sessions(session_id) ON DELETE CASCADE,
+            question_number INTEGER,
+            question_id INTEGER REFERENCES questions(question_id),
+            user_answer,
+            score REAL,
+            feedback,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            scorer_version INTEGER
+        )
+    ''')
     
-    cursor.execute('''
-        INSERT INTO sessions (role, level, status)
-        VALUES (?, ?, 'in_progress')
-    ''', (role, level))
+    rows = conn.execute('''
+        SELECT answer_id, session_id, question_number, question, ideal_answer, user_answer,
+               score, feedback, timestamp, scorer_version
+        FROM answers
+    ''')
+    while True:
+        chunk = rows.fetchmany(1000)
+        if not chunk:
+            break
+        conn.executemany('''
+            INSERT INTO answers_new (answer_id, session_id, question_number, question_id, user_answer,
+                                     score, feedback, timestamp, scorer_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (answer_id, session_id, number, _question_id(conn, question, ideal_answer), compress_text(user_answer),
+             score, compress_text(feedback), timestamp, scorer_version)
+            for answer_id, session_id, number, question, ideal_answer, user_answer, score, feedback, timestamp, scorer_version in chunk
+        ])
     
-    session_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    conn.execute('DROP VIEW IF EXISTS answers_search_source')
+    conn.execute('DROP TABLE answers')
+    conn.execute('ALTER TABLE answers_new RENAME TO answers')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answers_session ON answers(session_id, question_number)')
+    conn.execute('''
+        CREATE VIEW answer_texts AS
+        SELECT a.answer_id, a.session_id, a.question_number, q.question,
+               decompress_text(a.user_answer) AS user_answer, q.ideal_answer, a.score,
+               decompress_text(a.feedback) AS feedback, a.timestamp, a.scorer_version
+        FROM answers a
+        LEFT JOIN questions q ON q.question_id = a.question_id
+    ''')
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'answers_fts'").fetchone():
+        _create_answer_search_source(conn, 'answer_texts', 'question_id, user_answer, feedback')
+        conn.execute("INSERT INTO answers_fts(answers_fts) VALUES ('rebuild')")
+
+def _question_id(conn: sqlite3.Connection, question: str, ideal_answer: str) -> int:
+    content_hash = question_hash(question, ideal_answer)
+    conn.execute('''
+        INSERT INTO questions (content_hash, question, ideal_answer)
+        VALUES (?, ?, ?)
+        ON CONFLICT(content_hash) DO NOTHING
+    ''', (content_hash, question, ideal_answer))
+    return conn.execute('SELECT question_id FROM questions WHERE content_hash = ?', (content_hash,)).fetchone()[0]
+
+def _migration_answer_embeddings(conn: sqlite3.Connection):
+    # Kept out of answers so history queries never page the vectors in.
+    # embedding_id changes whenever a vector is rewritten, which lets
+    # answer_embeddings.py tell when its on-disk cache is stale.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS answer_embeddings (
+            embedding_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            answer_id INTEGER NOT NULL UNIQUE REFERENCES answers(answer_id) ON DELETE CASCADE,
+            model TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL
+        )
+    ''')
+
+def _migration_daily_rollups(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stats_daily (
+            day TEXT NOT NULL,
+            role TEXT NOT NULL,
+            level TEXT NOT NULL,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            scored_count INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0,
+            score_sq_sum REAL NOT NULL DEFAULT 0,
+            score_min REAL,
+            score_max REAL,
+            PRIMARY KEY (day, role, level)
+        ) WITHOUT ROWID
+    ''')
+    _rebuild_daily_rollups(conn)
+
+# Tables whose changes can alter what the cached read functions return
+VERSIONED_TABLES = ['sessions', 'answers', 'archived_sessions']
+
+def _migration_history_version(conn: sqlite3.Connection):
+    # Bumped by triggers on every history write, from any process or
+    # connection, so cached reads can tell whether they are still current
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS history_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO history_version (id, version) VALUES (1, 0)')
+    for table in VERSIONED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table}
+                BEGIN
+                    UPDATE history_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
+
+def _migration_score_histograms(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS score_histogram (
+            role TEXT NOT NULL,
+            level TEXT NOT NULL,
+            bin INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (role, level, bin)
+        ) WITHOUT ROWID
+    ''')
+    _rebuild_score_histograms(conn)
+
+def _migration_answer_minhash(conn: sqlite3.Connection):
+    # MinHash signature per answer, and one LSH bucket row per band so
+    # near-duplicates are found with LSH_BANDS index lookups. Existing answers
+    # are indexed by `python answer_similarity.py index`.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS answer_minhash (
+            answer_id INTEGER PRIMARY KEY REFERENCES answers(answer_id) ON DELETE CASCADE,
+            signature BLOB NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS answer_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            answer_id INTEGER NOT NULL REFERENCES answers(answer_id) ON DELETE CASCADE,
+            PRIMARY KEY (band, bucket, answer_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_lsh_answer ON answer_lsh(answer_id)')
+
+def _migration_scoring_stage(conn: sqlite3.Connection):
+    # Which cascade stage (rule, lexical, embedding or llm) decided the score;
+    # NULL for answers saved before it was recorded
+    if 'scoring_stage' not in _table_columns(conn, 'answers'):
+        conn.execute('ALTER TABLE answers ADD COLUMN scoring_stage TEXT')
+
+MIGRATIONS = [
+    (1, _migration_base_schema),
+    (2, _migration_scorer_version),
+    (3, _migration_history_indexes),
+    (4, _migration_cascading_deletes),
+    (5, _migration_statistics_aggregates),
+    (6, _migration_history_keyset_index),
+    (7, _migration_archived_sessions),
+    (8, _migration_answer_search),
+    (9, _migration_normalized_answers),
+    (10, _migration_answer_embeddings),
+    (11, _migration_daily_rollups),
+    (12, _migration_history_version),
+    (13, _migration_score_histograms),
+    (14, _migration_answer_minhash),
+    (15, _migration_scoring_stage),
+]
+
+def create_session(role: str, level: str, db_path: str = None) -> int:
+    with transaction(get_connection(db_path)) as conn:
+        cursor = conn.execute('''
+            INSERT INTO sessions (role, level, status)
+            VALUES (?, ?, 'in_progress')
+        ''', (role, level))
     
-    return session_id
+    return cursor.lastrowid
+
+def feedback_to_json(evaluation: dict) -> str:
+    return json.dumps({
+        'main_feedback': evaluation.get('feedback', ''),
+        'what_was_good': evaluation.get('what_was_good', ''),
+        'what_was_missing': evaluation.get('what_was_missing', ''),
+        'how_to_improve': evaluation.get('how_to_improve', '')
+    })
 
 def save_answer(session_id: int, question_number: int, question: str, 
-                user_answer: str, ideal_answer: str, evaluation: dict):
-    import json
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO answers (session_id, question_number, question, user_answer,
-                           ideal_answer, score, feedback)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+                user_answer: str, ideal_answer: str, evaluation: dict, db_path: str = None):
+    with transaction(get_connection(db_path)) as conn:
+        _insert_answer(conn, session_id, question_number, question, user_answer, ideal_answer, evaluation)
+
+def _insert_answer(conn: sqlite3.Connection, session_id: int, question_number: int, question: str,
+                   user_answer: str, ideal_answer: str, evaluation: dict):
+    cursor = conn.execute('''
+        INSERT INTO answers (session_id, question_number, question_id, user_answer,
+                           score, feedback, scorer_version, scoring_stage)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     ''', (
         session_id,
         question_number,
-        question,
-        user_answer,
-        ideal_answer,
+        _question_id(conn, question, ideal_answer),
+        compress_text(user_answer),
         evaluation.get('score', 0),
-        json.dumps({
-            'main_feedback': evaluation.get('feedback', ''),
-            'what_was_good': evaluation.get('what_was_good', ''),
-            'what_was_missing': evaluation.get('what_was_missing', ''),
-            'how_to_improve': evaluation.get('how_to_improve', '')
-        })
+        compress_text(feedback_to_json(evaluation)),
+        evaluation.get('scorer_version'),
+        evaluation.get('stage')
     ))
-    
-    conn.commit()
-    conn.close()
+    if evaluation.get('embedding') is not None:
+        store_embedding(conn, cursor.lastrowid, evaluation['embedding'])
+    index_answer_minhash(conn, cursor.lastrowid, user_answer)
+
+def store_embedding(conn: sqlite3.Connection, answer_id: int, embedding):
+    """Save an answer's embedding as a float16 BLOB, replacing any earlier one."""
+    vector = np.asarray(embedding, dtype=np.float16).ravel()
+    conn.execute('''
+        INSERT OR REPLACE INTO answer_embeddings (answer_id, model, dim, vector)
+        VALUES (?, ?, ?, ?)
+    ''', (answer_id, EMBEDDING_MODEL, len(vector), vector.tobytes()))
+
+# Multiply-add-shift hashes ((a*x + b) mod 2**64) >> 32 over 32-bit shingle
+# hashes; uint64 arithmetic wraps, so no modulo is needed. The seed is fixed:
+# changing it invalidates every stored signature.
+MINHASH_SEED = 1729
+_minhash_rng = np.random.RandomState(MINHASH_SEED)
+_MINHASH_A = _minhash_rng.randint(0, 2 ** 63, size=MINHASH_PERMUTATIONS, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+_MINHASH_B = _minhash_rng.randint(0, 2 ** 63, size=MINHASH_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+def minhash_signature(text: Optional[str]) -> Optional[np.ndarray]:
+    """
+    MinHash signature (MINHASH_PERMUTATIONS uint32 values) of the word
+    SHINGLE_SIZE-grams of text, or None if it has fewer than
+    MINHASH_MIN_TOKENS words: short answers match each other by chance.
+    """
+    tokens = re.findall(r'\w+', (text or '').lower())
+    if len(tokens) < max(MINHASH_MIN_TOKENS, SHINGLE_SIZE):
+        return None
+    shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_MINHASH_A[:, None] * hashes[None, :] + _MINHASH_B[:, None]) >> np.uint64(32)).min(axis=1).astype(np.uint32)
 
-def complete_session(session_id: int, average_score: float, total_questions: int):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def lsh_buckets(signature: np.ndarray) -> List[Tuple[int, int]]:
+    """(band, bucket) keys of a signature; answers sharing any key are candidate duplicates."""
+    return [
+        (band, int.from_bytes(
+            hashlib.blake2b(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes(), digest_size=8).digest(),
+            'little', signed=True
+        ))
+        for band in range(LSH_BANDS)
+    ]
+
+def index_answer_minhash(conn: sqlite3.Connection, answer_id: int, user_answer: Optional[str]) -> bool:
+    """Store an answer's MinHash signature and LSH buckets, replacing any earlier ones."""
+    conn.execute('DELETE FROM answer_lsh WHERE answer_id = ?', (answer_id,))
+    signature = minhash_signature(user_answer)
+    if signature is None:
+        conn.execute('DELETE FROM answer_minhash WHERE answer_id = ?', (answer_id,))
+        return False
+    conn.execute(
+        'INSERT OR REPLACE INTO answer_minhash (answer_id, signature) VALUES (?, ?)', (answer_id, signature.tobytes())
+    )
+    conn.executemany(
+        'INSERT INTO answer_lsh (band, bucket, answer_id) VALUES (?, ?, ?)',
+        [(band, bucket, answer_id) for band, bucket in lsh_buckets(signature)]
+    )
+    return True
+
+def complete_session(session_id: int, average_score: float, total_questions: int, db_path: str = None):
+    with transaction(get_connection(db_path)) as conn:
+        _mark_session_completed(conn, session_id, average_score, total_questions)
+
+def _mark_session_completed(conn: sqlite3.Connection, session_id: int, average_score: float, total_questions: int):
+    previous = conn.execute(
+        'SELECT role, status, average_score, level, date(start_time) FROM sessions WHERE session_id = ?', (session_id,)
+    ).fetchone()
+    if previous is None:
+        return
     
-    cursor.execute('''
+    conn.execute('''
         UPDATE sessions
         SET end_time = CURRENT_TIMESTAMP,
             average_score = ?,
@@ -98,133 +627,740 @@ def complete_session(session_id: int, average_score: float, total_questions: int
         WHERE session_id = ?
     ''', (average_score, total_questions, session_id))
     
-    conn.commit()
-    conn.close()
+    role, status, old_score, level, day = previous
+    if status == 'completed':
+        _adjust_statistics(conn, role, -1, old_score)
+        _adjust_score_histogram(conn, role, level, -1, old_score)
+        _refresh_daily_rollup(conn, day, role, level)
+    else:
+        _add_to_daily_rollup(conn, day, role, level, average_score)
+    _adjust_statistics(conn, role, 1, average_score)
+    _adjust_score_histogram(conn, role, level, 1, average_score)
+    _record_recent_score(conn, session_id, average_score)
+
+RECENT_SCORES_SIZE = 10
+
+def _adjust_statistics(conn: sqlite3.Connection, role: str, sign: int, score: Optional[float]):
+    scored = sign if score is not None else 0
+    score_delta = sign * score if score is not None else 0.0
+    conn.execute('''
+        UPDATE stats_totals
+        SET session_count = session_count + ?, scored_count = scored_count + ?, score_sum = score_sum + ?
+        WHERE id = 1
+    ''', (sign, scored, score_delta))
+    conn.execute('''
+        INSERT INTO stats_by_role (role, session_count, scored_count, score_sum)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(role) DO UPDATE SET
+            session_count = session_count + excluded.session_count,
+            scored_count = scored_count + excluded.scored_count,
+            score_sum = score_sum + excluded.score_sum
+    ''', (role, sign, scored, score_delta))
+    conn.execute('DELETE FROM stats_by_role WHERE role = ? AND session_count <= 0', (role,))
+
+def _add_to_daily_rollup(conn: sqlite3.Connection, day: str, role: str, level: str, score: Optional[float]):
+    conn.execute('''
+        INSERT INTO stats_daily (day, role, level, session_count, scored_count, score_sum, score_sq_sum, score_min, score_max)
+        VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+        ON CONFLICT(day, role, level) DO UPDATE SET
+            session_count = session_count + 1,
+            scored_count = scored_count + excluded.scored_count,
+            score_sum = score_sum + excluded.score_sum,
+            score_sq_sum = score_sq_sum + excluded.score_sq_sum,
+            score_min = CASE WHEN excluded.score_min IS NULL THEN score_min
+                             ELSE MIN(COALESCE(score_min, excluded.score_min), excluded.score_min) END,
+            score_max = CASE WHEN excluded.score_max IS NULL THEN score_max
+                             ELSE MAX(COALESCE(score_max, excluded.score_max), excluded.score_max) END
+    ''', (
+        day, role, level,
+        1 if score is not None else 0,
+        score or 0.0,
+        score * score if score is not None else 0.0,
+        score,
+        score
+    ))
+
+_DAILY_ROLLUP_SELECT = '''
+    SELECT date(start_time) AS day, role, level, COUNT(*), COUNT(average_score),
+           COALESCE(SUM(average_score), 0), COALESCE(SUM(average_score * average_score), 0),
+           MIN(average_score), MAX(average_score)
+    FROM {source}
+'''
+
+def _refresh_daily_rollup(conn: sqlite3.Connection, day: str, role: str, level: str):
+    """Recompute one rollup row; needed when a score leaves it, since min/max cannot be decremented."""
+    conn.execute('DELETE FROM stats_daily WHERE day = ? AND role = ? AND level = ?', (day, role, level))
+    conn.execute(f'''
+        INSERT INTO stats_daily (day, role, level, session_count, scored_count, score_sum, score_sq_sum, score_min, score_max)
+        {_DAILY_ROLLUP_SELECT.format(source=_completed_sessions_source(conn))}
+        WHERE start_time >= ? AND start_time < date(?, '+1 day') AND role = ? AND level = ?
+        GROUP BY day, role, level
+    ''', (day, day, role, level))
+
+def _rebuild_daily_rollups(conn: sqlite3.Connection):
+    conn.execute('DELETE FROM stats_daily')
+    conn.execute(f'''
+        INSERT INTO stats_daily (day, role, level, session_count, scored_count, score_sum, score_sq_sum, score_min, score_max)
+        {_DAILY_ROLLUP_SELECT.format(source=_completed_sessions_source(conn))}
+        GROUP BY day, role, level
+    ''')
+
+# Completed-session scores per role and level, in bins of 0.1 from 0 to 10.
+# Bins from different roles or levels add up, so any cohort's percentiles
+# are read from at most SCORE_HISTOGRAM_BINS rows whatever the history size.
+SCORE_HISTOGRAM_BINS = 101
+_SCORE_BIN_SQL = 'CAST(MIN(MAX(average_score, 0), 10) * 10 + 0.5 AS INTEGER)'
+
+def _score_bin(score: float) -> int:
+    return int(min(max(score, 0.0), 10.0) * 10 + 0.5)
 
-def get_session_history(limit: int = None) -> list:
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def _adjust_score_histogram(conn: sqlite3.Connection, role: str, level: str, sign: int, score: Optional[float]):
+    if score is None:
+        return
+    conn.execute('''
+        INSERT INTO score_histogram (role, level, bin, count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(role, level, bin) DO UPDATE SET count = count + excluded.count
+    ''', (role, level, _score_bin(score), sign))
+    conn.execute('DELETE FROM score_histogram WHERE role = ? AND level = ? AND count <= 0', (role, level))
+
+def _rebuild_score_histograms(conn: sqlite3.Connection):
+    conn.execute('DELETE FROM score_histogram')
+    conn.execute(f'''
+        INSERT INTO score_histogram (role, level, bin, count)
+        SELECT role, level, {_SCORE_BIN_SQL}, COUNT(*)
+        FROM {_completed_sessions_source(conn)}
+        WHERE average_score IS NOT NULL
+        GROUP BY 1, 2, 3
+    ''')
+
+def _score_histogram(conn: sqlite3.Connection, role: Optional[str], level: Optional[str]) -> List[int]:
+    counts = [0] * SCORE_HISTOGRAM_BINS
+    for score_bin, count in conn.execute('''
+        SELECT bin, SUM(count)
+        FROM score_histogram
+        WHERE (? IS NULL OR role = ?) AND (? IS NULL OR level = ?)
+        GROUP BY bin
+    ''', (role, role, level, level)):
+        counts[score_bin] = count
+    return counts
+
+def histogram_percentile(counts: List[int], score: float) -> Optional[float]:
+    """Percentile rank (0-100) of score in a score histogram; ties count half. None if it is empty."""
+    total = sum(counts)
+    if not total:
+        return None
+    score_bin = _score_bin(score)
+    below = sum(counts[:score_bin])
+    return round(100.0 * (below + counts[score_bin] / 2) / total, 1)
+
+def histogram_quantiles(counts: List[int], quantiles=(25, 50, 75, 90)) -> Dict[int, Optional[float]]:
+    """Score at each percentile in quantiles, to the histogram's 0.1 resolution."""
+    total = sum(counts)
+    result = {}
+    for q in quantiles:
+        if not total:
+            result[q] = None
+            continue
+        target = q / 100 * total
+        cumulative = 0
+        for score_bin, count in enumerate(counts):
+            cumulative += count
+            if count and cumulative >= target:
+                result[q] = score_bin / 10
+                break
+    return result
+
+def _record_recent_score(conn: sqlite3.Connection, session_id: int, score: Optional[float]):
+    updated = conn.execute(
+        'UPDATE stats_recent_scores SET score = ? WHERE session_id = ?', (score, session_id)
+    ).rowcount
+    if updated:
+        return
+    seq = conn.execute('SELECT next_seq FROM stats_totals WHERE id = 1').fetchone()[0]
+    conn.execute('INSERT INTO stats_recent_scores (seq, session_id, score) VALUES (?, ?, ?)', (seq, session_id, score))
+    conn.execute('UPDATE stats_totals SET next_seq = next_seq + 1 WHERE id = 1')
+    conn.execute('DELETE FROM stats_recent_scores WHERE seq <= ?', (seq - RECENT_SCORES_SIZE,))
+
+def _refill_recent_scores(conn: sqlite3.Connection):
+    conn.execute('DELETE FROM stats_recent_scores')
+    rows = conn.execute(f'''
+        SELECT session_id, average_score
+        FROM {_completed_sessions_source(conn)}
+        ORDER BY start_time DESC
+        LIMIT ?
+    ''', (RECENT_SCORES_SIZE,)).fetchall()
+    next_seq = conn.execute('SELECT next_seq FROM stats_totals WHERE id = 1').fetchone()[0]
+    conn.executemany(
+        'INSERT INTO stats_recent_scores (seq, session_id, score) VALUES (?, ?, ?)',
+        [(next_seq - 1 - i, session_id, score) for i, (session_id, score) in enumerate(rows)]
+    )
+
+def _completed_sessions_source(conn: sqlite3.Connection) -> str:
+    """Completed sessions counted by the statistics: live ones plus archived ones."""
+    columns = 'session_id, role, level, start_time, average_score'
+    source = f"SELECT {columns} FROM sessions WHERE status = 'completed'"
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archived_sessions'").fetchone():
+        source += f" UNION ALL SELECT {columns} FROM archived_sessions WHERE status = 'completed'"
+    return f'({source})'
+
+def _rebuild_statistics(conn: sqlite3.Connection):
+    source = _completed_sessions_source(conn)
+    conn.execute('DELETE FROM stats_totals')
+    conn.execute('DELETE FROM stats_by_role')
+    conn.execute(f'''
+        INSERT INTO stats_totals (id, session_count, scored_count, score_sum, next_seq)
+        SELECT 1, COUNT(*), COUNT(average_score), COALESCE(SUM(average_score), 0), ? + 1
+        FROM {source}
+    ''', (RECENT_SCORES_SIZE,))
+    conn.execute(f'''
+        INSERT INTO stats_by_role (role, session_count, scored_count, score_sum)
+        SELECT role, COUNT(*), COUNT(average_score), COALESCE(SUM(average_score), 0)
+        FROM {source}
+        GROUP BY role
+    ''')
+    _refill_recent_scores(conn)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_daily'").fetchone():
+        _rebuild_daily_rollups(conn)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'score_histogram'").fetchone():
+        _rebuild_score_histograms(conn)
+    # The aggregates may have changed without any history row changing
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_version'").fetchone():
+        conn.execute('UPDATE history_version SET version = version + 1 WHERE id = 1')
+
+def rebuild_statistics(db_path: str = None):
+    """Recompute the materialized statistics from the sessions table."""
+    _await_pending_writes(db_path=db_path)
+    with transaction(get_connection(db_path)) as conn:
+        _rebuild_statistics(conn)
+
+class WriteBehindWriter:
+    """
+    Applies answer and session writes on a background thread, committing
+    whatever has queued up (optionally waiting `linger` seconds for more)
+    in one transaction.
+
+    durability="normal" returns to the caller immediately; a crash can lose
+    writes still in the queue. durability="full" blocks the caller until its
+    write is committed with synchronous=FULL, trading latency for safety
+    while still grouping commits from concurrent sessions.
+    """
+    
+    def __init__(self, db_path: str = None, durability: str = "normal",
+                 max_batch: int = 200, linger: float = 0.0):
+        if durability not in ("normal", "full"):
+            raise ValueError(f"Unknown durability setting: {durability}")
+        self.db_path = db_path or DB_PATH
+        self.durability = durability
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+    
+    def save_answer(self, session_id: int, question_number: int, question: str,
+                    user_answer: str, ideal_answer: str, evaluation: dict):
+        self._submit(session_id, _insert_answer,
+                     (session_id, question_number, question, user_answer, ideal_answer, dict(evaluation)))
+    
+    def complete_session(self, session_id: int, average_score: float, total_questions: int):
+        self._submit(session_id, _mark_session_completed, (session_id, average_score, total_questions))
+    
+    def wait_for_session(self, session_id: int, timeout: float = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending.get(session_id), timeout)
+    
+    def flush(self, timeout: float = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending, timeout)
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def close(self):
+        """Stop accepting writes, apply everything already queued and stop the thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+    
+    def _submit(self, session_id: int, operation, args: tuple):
+        done = threading.Event()
+        outcome = {}
+        # Checked and queued under the lock, so nothing lands behind close()'s sentinel
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("WriteBehindWriter is closed")
+            self._pending[session_id] = self._pending.get(session_id, 0) + 1
+            self._queue.put((session_id, operation, args, done, outcome))
+        
+        if self.durability == "full":
+            done.wait()
+            if 'error' in outcome:
+                raise outcome['error']
+    
+    def _run(self):
+        conn = get_connection(self.db_path)
+        if self.durability == "full":
+            conn.execute('PRAGMA synchronous=FULL')
+        
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=self.linger) if self.linger else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._apply(conn, batch)
+    
+    def _apply(self, conn: sqlite3.Connection, batch: list):
+        try:
+            with transaction(conn):
+                for _, operation, args, _, _ in batch:
+                    operation(conn, *args)
+        except Exception as e:
+            # Retry one by one so a single bad write does not drop the group
+            print(f"Grouped write failed, retrying individually: {e}")
+            for _, operation, args, _, outcome in batch:
+                try:
+                    with transaction(conn):
+                        operation(conn, *args)
+                except Exception as item_error:
+                    print(f"Deferred write failed: {item_error}")
+                    outcome['error'] = item_error
+        
+        with self._condition:
+            for session_id, _, _, done, _ in batch:
+                self._pending[session_id] -= 1
+                if not self._pending[session_id]:
+                    del self._pending[session_id]
+                done.set()
+            self._condition.notify_all()
+
+# One writer per database file, so each tenant's shard commits independently.
+# At most MAX_OPEN_SHARDS are kept; the least recently used one is drained
+# and closed when another shard needs a writer.
+_writers: "OrderedDict[str, WriteBehindWriter]" = OrderedDict()
+_writer_lock = threading.Lock()
+
+def get_writer() -> WriteBehindWriter:
+    db_path = current_db_path()
+    with _writer_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = WriteBehindWriter(db_path, WRITE_BEHIND_DURABILITY)
+            _writers[db_path] = writer
+            while len(_writers) > MAX_OPEN_SHARDS:
+                # Closed under the lock, so readers of that shard never miss its queued writes
+                _writers.popitem(last=False)[1].close()
+        else:
+            _writers.move_to_end(db_path)
+        return writer
+
+def _submit_deferred(method: str, *args):
+    while True:
+        writer = get_writer()
+        try:
+            return getattr(writer, method)(*args)
+        except RuntimeError:
+            # Evicted between lookup and submit; the next lookup opens a new writer
+            if not writer.closed:
+                raise
+
+def save_answer_deferred(session_id: int, question_number: int, question: str,
+                         user_answer: str, ideal_answer: str, evaluation: dict):
+    _submit_deferred('save_answer', session_id, question_number, question, user_answer, ideal_answer, evaluation)
+
+def complete_session_deferred(session_id: int, average_score: float, total_questions: int):
+    _submit_deferred('complete_session', session_id, average_score, total_questions)
+
+@atexit.register
+def close_writers():
+    with _writer_lock:
+        while _writers:
+            _writers.popitem(last=False)[1].close()
+
+def flush_writes(timeout: float = None) -> bool:
+    return all(writer.flush(timeout) for writer in list(_writers.values()))
+
+def _await_pending_writes(session_id: int = None, db_path: str = None):
+    writer = _writers.get(db_path or current_db_path())
+    if writer is None:
+        return
+    if session_id is None:
+        writer.flush()
+    else:
+        writer.wait_for_session(session_id)
+
+_read_cache = OrderedDict()
+_read_cache_lock = threading.Lock()
+
+def _history_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute('SELECT version FROM history_version WHERE id = 1').fetchone()
+    return row[0] if row else 0
+
+def _hashable(value):
+    """value with lists turned into tuples, so list arguments can be part of a cache key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+def versioned_cache(per_session: bool = False):
+    """
+    Cache a read function's results per database file and arguments, valid
+    for as long as history_version is unchanged. Writes from any process
+    bump the version, so there is no time-based expiry. Callers get a copy
+    and may modify it. Set per_session when the first argument is a
+    session_id, so only that session's deferred writes are waited for. A
+    db_path keyword argument selects the database instead of the current one.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            db_path = kwargs.get('db_path') or current_db_path()
+            _await_pending_writes(args[0] if per_session and args else None, db_path)
+            conn = get_connection(db_path)
+            if conn.in_transaction:
+                # Uncommitted changes may still be rolled back
+                return fn(*args, **kwargs)
+            
+            key = (db_path, fn.__name__, _hashable(args), _hashable(sorted(kwargs.items())))
+            version = _history_version(conn)
+            with _read_cache_lock:
+                entry = _read_cache.get(key)
+                if entry is not None and entry[0] == version:
+                    _read_cache.move_to_end(key)
+                    return copy.deepcopy(entry[1])
+            
+            # Rows committed after the version was read only make this entry
+            # look older than it is, never newer
+            result = fn(*args, **kwargs)
+            with _read_cache_lock:
+                _read_cache[key] = (version, copy.deepcopy(result))
+                _read_cache.move_to_end(key)
+                while len(_read_cache) > READ_CACHE_SIZE:
+                    _read_cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+def clear_read_cache():
+    with _read_cache_lock:
+        _read_cache.clear()
+
+SESSION_COLUMNS = '''session_id, role, level, start_time, end_time,
+               average_score, total_questions, status'''
+
+class AnswerSummary(NamedTuple):
+    """Answer row for listings: no ideal answer and no feedback JSON to decode."""
+    session_id: int
+    question_number: int
+    question: str
+    user_answer: str
+    score: float
+    category: str
+
+def _session_from_row(row) -> dict:
+    return {
+        'session_id': row[0],
+        'role': row[1],
+        'level': row[2],
+        'start_time': row[3],
+        'end_time': row[4],
+        'average_score': row[5],
+        'total_questions': row[6],
+        'status': row[7]
+    }
+
+def _categorize(score: float) -> str:
+    return 'Excellent' if score >= 8 else 'Average' if score >= 5 else 'Poor'
+
+def _answer_from_row(row) -> dict:
+    return {
+        'question_number': row[0],
+        'question': row[1],
+        'user_answer': row[2],
+        'ideal_answer': row[3],
+        'score': row[4],
+        'category': _categorize(row[4]),
+        'feedback': json.loads(row[5]) if row[5] else {},
+        'timestamp': row[6]
+    }
+
+@versioned_cache()
+def get_session_history(limit: int = None, db_path: str = None) -> list:
+    _await_pending_writes(db_path=db_path)
+    cursor = get_connection(db_path).cursor()
     
     if limit:
-        cursor.execute('''
-            SELECT session_id, role, level, start_time, end_time,
-                   average_score, total_questions, status
+        cursor.execute(f'''
+            SELECT {SESSION_COLUMNS}
             FROM sessions
             ORDER BY start_time DESC
             LIMIT ?
         ''', (limit,))
     else:
-        cursor.execute('''
-            SELECT session_id, role, level, start_time, end_time,
-                   average_score, total_questions, status
+        cursor.execute(f'''
+            SELECT {SESSION_COLUMNS}
             FROM sessions
             ORDER BY start_time DESC
         ''')
     
-    sessions = []
-    for row in cursor.fetchall():
-        sessions.append({
-            'session_id': row[0],
-            'role': row[1],
-            'level': row[2],
-            'start_time': row[3],
-            'end_time': row[4],
-            'average_score': row[5],
-            'total_questions': row[6],
-            'status': row[7]
-        })
+    return [_session_from_row(row) for row in cursor.fetchall()]
+
+@versioned_cache()
+def get_session_page(cursor: Optional[Tuple[str, int]] = None, page_size: int = 20,
+                     db_path: str = None) -> Tuple[list, Optional[Tuple[str, int]]]:
+    """
+    One page of sessions, newest first, using keyset pagination on
+    (start_time, session_id). Pass the returned cursor to get the next page;
+    it is None on the last page. Cost is independent of how deep the page is.
+    """
+    _await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
     
-    conn.close()
-    return sessions
+    if cursor is None:
+        rows = conn.execute(f'''
+            SELECT {SESSION_COLUMNS}
+            FROM sessions
+            ORDER BY start_time DESC, session_id DESC
+            LIMIT ?
+        ''', (page_size + 1,)).fetchall()
+    else:
+        rows = conn.execute(f'''
+            SELECT {SESSION_COLUMNS}
+            FROM sessions
+            WHERE (start_time, session_id) < (?, ?)
+            ORDER BY start_time DESC, session_id DESC
+            LIMIT ?
+        ''', (cursor[0], cursor[1], page_size + 1)).fetchall()
+    
+    sessions = [_session_from_row(row) for row in rows[:page_size]]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = sessions[-1]
+        next_cursor = (last['start_time'], last['session_id'])
+    return sessions, next_cursor
 
-def get_session_details(session_id: int) -> Optional[Dict]:
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+@versioned_cache(per_session=True)
+def get_session_details(session_id: int, db_path: str = None) -> Optional[Dict]:
+    _await_pending_writes(session_id, db_path)
+    cursor = get_connection(db_path).cursor()
     
-    cursor.execute('''
-        SELECT session_id, role, level, start_time, end_time,
-               average_score, total_questions, status
+    cursor.execute(f'''
+        SELECT {SESSION_COLUMNS}
         FROM sessions
         WHERE session_id = ?
     ''', (session_id,))
     
     row = cursor.fetchone()
     if not row:
-        conn.close()
-        return None
+        return _get_archived_session(session_id, db_path)
     
-    session = {
-        'session_id': row[0],
-        'role': row[1],
-        'level': row[2],
-        'start_time': row[3],
-        'end_time': row[4],
-        'average_score': row[5],
-        'total_questions': row[6],
-        'status': row[7],
-        'answers': []
-    }
+    session = _session_from_row(row)
     
     cursor.execute('''
         SELECT question_number, question, user_answer, ideal_answer,
                score, feedback, timestamp
-        FROM answers
+        FROM answer_texts
         WHERE session_id = ?
         ORDER BY question_number
     ''', (session_id,))
     
-    import json
-    for row in cursor.fetchall():
-        feedback_json = json.loads(row[5]) if row[5] else {}
-        session['answers'].append({
-            'question_number': row[0],
-            'question': row[1],
-            'user_answer': row[2],
-            'ideal_answer': row[3],
-            'score': row[4],
-            'category': 'Excellent' if row[4] >= 8 else 'Average' if row[4] >= 5 else 'Poor',
-            'feedback': feedback_json,
-            'timestamp': row[6]
-        })
-    
-    conn.close()
+    session['answers'] = [_answer_from_row(row) for row in cursor.fetchall()]
     return session
 
-def get_statistics() -> Dict:
-    init_database()
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def _get_archived_session(session_id: int, db_path: str = None) -> Optional[Dict]:
+    row = get_connection(db_path).execute('''
+        SELECT archive_file, archive_offset, archive_length
+        FROM archived_sessions
+        WHERE session_id = ?
+    ''', (session_id,)).fetchone()
+    if not row:
+        return None
+    
+    archive_file, offset, length = row
+    try:
+        with open(archive_file, 'rb') as f:
+            f.seek(offset)
+            return json.loads(gzip.decompress(f.read(length)))
+    except (OSError, ValueError) as e:
+        print(f"Error reading archived session {session_id} from {archive_file}: {e}")
+        return None
+
+@versioned_cache()
+def get_sessions_details(session_ids: List[int], summaries: bool = False, db_path: str = None) -> Dict[int, Dict]:
+    """
+    Details for many sessions at once, keyed by session_id, with all answers
+    fetched in a single query. With summaries=True answers are AnswerSummary
+    rows and feedback JSON is never decoded.
+    """
+    if not session_ids:
+        return {}
+    for session_id in session_ids:
+        _await_pending_writes(session_id, db_path)
+    conn = get_connection(db_path)
+    ids_json = json.dumps(list(session_ids))
+    
+    sessions = {}
+    for row in conn.execute(f'''
+        SELECT {SESSION_COLUMNS}
+        FROM sessions
+        WHERE session_id IN (SELECT value FROM json_each(?))
+    ''', (ids_json,)):
+        session = _session_from_row(row)
+        session['answers'] = []
+        sessions[session['session_id']] = session
+    
+    if summaries:
+        rows = conn.execute('''
+            SELECT session_id, question_number, question, user_answer, score
+            FROM answer_texts
+            WHERE session_id IN (SELECT value FROM json_each(?))
+            ORDER BY session_id, question_number
+        ''', (ids_json,))
+        for session_id, number, question, user_answer, score in rows:
+            sessions[session_id]['answers'].append(
+                AnswerSummary(session_id, number, question, user_answer, score, _categorize(score))
+            )
+    else:
+        rows = conn.execute('''
+            SELECT session_id, question_number, question, user_answer, ideal_answer,
+                   score, feedback, timestamp
+            FROM answer_texts
+            WHERE session_id IN (SELECT value FROM json_each(?))
+            ORDER BY session_id, question_number
+        ''', (ids_json,))
+        for row in rows:
+            sessions[row[0]]['answers'].append(_answer_from_row(row[1:]))
+    
+    return sessions
+
+def _fts_query(query: str) -> str:
+    # Quote every term so user input cannot break FTS5 syntax; terms are
+    # ANDed and prefix-matched
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+@versioned_cache()
+def search_answers(query: str, role: str = None, level: str = None,
+                   offset: int = 0, page_size: int = 20, db_path: str = None) -> Tuple[List[Dict], Optional[int]]:
+    """
+    Full-text search over questions, answers and feedback, best matches
+    first. Returns one page of hits and the offset of the next page (None on
+    the last page). Snippets mark matched terms in bold.
+    """
+    match = _fts_query(query)
+    if not match:
+        return [], None
+    _await_pending_writes(db_path=db_path)
     
-    cursor.execute('SELECT COUNT(*) FROM sessions WHERE status = "completed"')
-    total_sessions = cursor.fetchone()[0]
+    try:
+        rows = get_connection(db_path).execute('''
+            SELECT a.answer_id, a.session_id, s.role, s.level, s.start_time,
+                   a.question_number, a.question, a.score,
+                   snippet(answers_fts, -1, '**', '**', '...', 16)
+            FROM answers_fts
+            JOIN answer_texts a ON a.answer_id = answers_fts.rowid
+            JOIN sessions s ON s.session_id = a.session_id
+            WHERE answers_fts MATCH ?
+              AND (? IS NULL OR s.role = ?)
+              AND (? IS NULL OR s.level = ?)
+            ORDER BY bm25(answers_fts, 2.0, 1.0, 0.5)
+            LIMIT ? OFFSET ?
+        ''', (match, role, role, level, level, page_size + 1, offset)).fetchall()
+    except sqlite3.OperationalError as e:
+        print(f"Error searching answers: {e}")
+        return [], None
     
-    cursor.execute('SELECT AVG(average_score) FROM sessions WHERE status = "completed"')
-    overall_avg = cursor.fetchone()[0] or 0
+    results = [
+        {
+            'answer_id': row[0],
+            'session_id': row[1],
+            'role': row[2],
+            'level': row[3],
+            'start_time': row[4],
+            'question_number': row[5],
+            'question': row[6],
+            'score': row[7],
+            'category': _categorize(row[7]),
+            'snippet': row[8]
+        }
+        for row in rows[:page_size]
+    ]
+    next_offset = offset + page_size if len(rows) > page_size else None
+    return results, next_offset
+
+@versioned_cache()
+def get_statistics(db_path: str = None) -> Dict:
+    _await_pending_writes(db_path=db_path)
+    cursor = get_connection(db_path).cursor()
+    
+    cursor.execute('SELECT session_count, scored_count, score_sum FROM stats_totals WHERE id = 1')
+    total_sessions, scored_count, score_sum = cursor.fetchone() or (0, 0, 0.0)
+    overall_avg = score_sum / scored_count if scored_count else 0
     
     cursor.execute('''
-        SELECT role, AVG(average_score), COUNT(*)
-        FROM sessions
-        WHERE status = "completed"
-        GROUP BY role
+        SELECT role, score_sum, scored_count, session_count
+        FROM stats_by_role
+        ORDER BY role
     ''')
     
     role_stats = {}
     for row in cursor.fetchall():
         role_stats[row[0]] = {
-            'average_score': round(row[1], 1),
-            'session_count': row[2]
+            'average_score': round(row[1] / row[2], 1) if row[2] else 0,
+            'session_count': row[3]
         }
     
     cursor.execute('''
-        SELECT average_score
-        FROM sessions
-        WHERE status = "completed"
-        ORDER BY start_time DESC
-        LIMIT 10
-    ''')
+        SELECT score
+        FROM stats_recent_scores
+        ORDER BY seq DESC
+        LIMIT ?
+    ''', (RECENT_SCORES_SIZE,))
     
     recent_scores = [row[0] for row in cursor.fetchall() if row[0]]
     
+    trend = score_trend(recent_scores)
+    
+    return {
+        'total_completed_sessions': total_sessions,
+        'overall_average_score': round(overall_avg, 1),
+        'performance_by_role': role_stats,
+        'trend': trend
+    }
+
+@versioned_cache()
+def get_score_percentile(score: float, role: str = None, level: str = None) -> Optional[float]:
+    """
+    Where score ranks (0-100) among completed sessions of role and level
+    (None means all of them). None when there is no history to compare with.
+    """
+    return histogram_percentile(_score_histogram(get_connection(), role, level), score)
+
+@versioned_cache()
+def get_score_distribution(role: str = None, level: str = None) -> Dict:
+    """Number of scored sessions and the 25th/50th/75th/90th percentile scores."""
+    counts = _score_histogram(get_connection(), role, level)
+    return {'sessions': sum(counts), 'quantiles': histogram_quantiles(counts)}
+
+def score_trend(recent_scores: list) -> str:
+    """Compare the newest five scores (newest first) with the five before them."""
     trend = "N/A"
     if len(recent_scores) >= 2:
         recent_avg = sum(recent_scores[:5]) / min(5, len(recent_scores[:5]))
@@ -236,53 +1372,305 @@ def get_statistics() -> Dict:
         else:
             trend = "Stable"
     
-    conn.close()
+    return trend
+
+TIMESERIES_BUCKETS = {
+    'day': 'day',
+    'week': "date(day, 'weekday 0', '-6 days')",
+    'month': "substr(day, 1, 7)"
+}
+
+@versioned_cache()
+def get_score_timeseries(role: str = None, level: str = None, since: str = None, until: str = None,
+                         bucket: str = 'day', db_path: str = None) -> List[Dict]:
+    """
+    Completed-session scores per day, week (starting Monday) or month, read
+    from the daily rollups. since/until are YYYY-MM-DD, until exclusive.
+    """
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    _await_pending_writes(db_path=db_path)
     
+    conditions = []
+    params = []
+    for clause, value in (('day >= ?', since), ('day < ?', until), ('role = ?', role), ('level = ?', level)):
+        if value is not None:
+            conditions.append(clause)
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    rows = get_connection(db_path).execute(f'''
+        SELECT {TIMESERIES_BUCKETS[bucket]} AS period, SUM(session_count), SUM(scored_count),
+               SUM(score_sum), SUM(score_sq_sum), MIN(score_min), MAX(score_max)
+        FROM stats_daily
+        {where}
+        GROUP BY period
+        ORDER BY period
+    ''', params).fetchall()
+    
+    series = []
+    for period, sessions, scored, total, sq_total, low, high in rows:
+        mean = total / scored if scored else None
+        stddev = max(0.0, sq_total / scored - mean * mean) ** 0.5 if scored else None
+        series.append({
+            'period': period,
+            'sessions': sessions,
+            'average_score': round(mean, 2) if mean is not None else None,
+            'stddev': round(stddev, 2) if stddev is not None else None,
+            'min_score': low,
+            'max_score': high
+        })
+    return series
+
+def list_tenants() -> List[str]:
+    return sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(TENANT_DATA_DIR, '*.db'))
+    )
+
+def for_each_tenant(fn, *args, **kwargs) -> Dict[str, object]:
+    """Run fn against every tenant shard in turn; results keyed by tenant."""
+    results = {}
+    for tenant in list_tenants():
+        with tenant_scope(tenant):
+            results[tenant] = fn(*args, **kwargs)
+    return results
+
+def get_all_tenants_history(limit: int = 50) -> list:
+    """Newest sessions across all tenants, each tagged with its tenant."""
+    per_tenant = for_each_tenant(get_session_history, limit)
+    tagged = [
+        [dict(session, tenant=tenant) for session in sessions]
+        for tenant, sessions in per_tenant.items()
+    ]
+    merged = heapq.merge(*tagged, key=lambda s: (s['start_time'] or '', s['session_id']), reverse=True)
+    return list(merged)[:limit]
+
+def _raw_statistics(db_path: str = None) -> Dict:
+    _await_pending_writes(db_path=db_path)
+    conn = get_connection(db_path)
+    totals = conn.execute('SELECT session_count, scored_count, score_sum FROM stats_totals WHERE id = 1').fetchone()
+    # The recent-scores ring, as in get_statistics; start times are looked up
+    # by primary key only so the tenants' rings can be merged newest first
     return {
-        'total_completed_sessions': total_sessions,
-        'overall_average_score': round(overall_avg, 1),
-        'performance_by_role': role_stats,
-        'trend': trend
+        'totals': totals or (0, 0, 0.0),
+        'by_role': conn.execute('SELECT role, session_count, scored_count, score_sum FROM stats_by_role').fetchall(),
+        'recent': conn.execute('''
+            SELECT COALESCE((SELECT start_time FROM sessions s WHERE s.session_id = r.session_id),
+                            (SELECT start_time FROM archived_sessions a WHERE a.session_id = r.session_id)),
+                   r.score
+            FROM stats_recent_scores r
+            ORDER BY r.seq DESC
+            LIMIT ?
+        ''', (RECENT_SCORES_SIZE,)).fetchall()
     }
 
-def delete_session(session_id: int):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM answers WHERE session_id = ?', (session_id,))
-    cursor.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+def get_all_tenants_statistics() -> Dict:
+    """get_statistics() over every tenant shard, merged from the raw sums."""
+    session_count = scored_count = 0
+    score_sum = 0.0
+    roles = {}
+    recent = []
+    for raw in for_each_tenant(_raw_statistics).values():
+        session_count += raw['totals'][0]
+        scored_count += raw['totals'][1]
+        score_sum += raw['totals'][2]
+        for role, sessions, scored, total in raw['by_role']:
+            merged = roles.setdefault(role, [0, 0, 0.0])
+            merged[0] += sessions
+            merged[1] += scored
+            merged[2] += total
+        recent.extend(raw['recent'])
     
-    conn.commit()
-    conn.close()
+    recent.sort(key=lambda row: row[0] or '', reverse=True)
+    return {
+        'total_completed_sessions': session_count,
+        'overall_average_score': round(score_sum / scored_count, 1) if scored_count else 0,
+        'performance_by_role': {
+            role: {'average_score': round(total / scored, 1) if scored else 0, 'session_count': sessions}
+            for role, (sessions, scored, total) in sorted(roles.items())
+        },
+        'trend': score_trend([score for _, score in recent[:RECENT_SCORES_SIZE] if score])
+    }
 
-def export_session_to_text(session_id: int, output_file: str):
+def delete_session(session_id: int, db_path: str = None):
+    _await_pending_writes(session_id, db_path)
+    with transaction(get_connection(db_path)) as conn:
+        row = conn.execute(
+            'SELECT role, status, average_score, level, date(start_time) FROM sessions WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        # answers go with the session through ON DELETE CASCADE
+        conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+        if row and row[1] == 'completed':
+            _adjust_statistics(conn, row[0], -1, row[2])
+            _adjust_score_histogram(conn, row[0], row[3], -1, row[2])
+            _refresh_daily_rollup(conn, row[4], row[0], row[3])
+            if conn.execute('DELETE FROM stats_recent_scores WHERE session_id = ?', (session_id,)).rowcount:
+                _refill_recent_scores(conn)
+
+def render_session_report(session_id: int) -> Optional[str]:
     session = get_session_details(session_id)
     if not session:
+        return None
+    return format_session_report(session)
+
+def format_session_report(session: dict) -> str:
+    f = io.StringIO()
+    f.write("="*60 + "\n")
+    f.write("AI INTERVIEW AGENT - PERFORMANCE REPORT\n")
+    f.write("="*60 + "\n\n")
+    f.write(f"Role: {session['role']}\n")
+    f.write(f"Level: {session['level']}\n")
+    f.write(f"Date: {session['start_time']}\n")
+    f.write(f"Average Score: {session['average_score'] or 0:.1f}/10\n")
+    f.write(f"Total Questions: {session['total_questions']}\n")
+    f.write("\n" + "="*60 + "\n\n")
+    
+    for answer in session['answers']:
+        f.write(f"Question {answer['question_number']}:\n")
+        f.write(f"{answer['question']}\n\n")
+        f.write(f"Your Answer:\n{answer['user_answer']}\n\n")
+        f.write(f"Score: {answer['score']}/10 ({answer['category']})\n\n")
+        
+        feedback = answer['feedback']
+        f.write(f"Feedback: {feedback.get('main_feedback', '')}\n")
+        f.write(f"What was good: {feedback.get('what_was_good', '')}\n")
+        f.write(f"What was missing: {feedback.get('what_was_missing', '')}\n")
+        f.write(f"How to improve: {feedback.get('how_to_improve', '')}\n\n")
+        f.write(f"Ideal Answer:\n{answer['ideal_answer']}\n\n")
+        f.write("-"*60 + "\n\n")
+    
+    return f.getvalue()
+
+def export_session_to_text(session_id: int, output_file: str):
+    report = render_session_report(session_id)
+    if report is None:
         return False
     
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("="*60 + "\n")
-        f.write("AI INTERVIEW AGENT - PERFORMANCE REPORT\n")
-        f.write("="*60 + "\n\n")
-        f.write(f"Role: {session['role']}\n")
-        f.write(f"Level: {session['level']}\n")
-        f.write(f"Date: {session['start_time']}\n")
-        f.write(f"Average Score: {session['average_score']:.1f}/10\n")
-        f.write(f"Total Questions: {session['total_questions']}\n")
-        f.write("\n" + "="*60 + "\n\n")
-        
-        for answer in session['answers']:
-            f.write(f"Question {answer['question_number']}:\n")
-            f.write(f"{answer['question']}\n\n")
-            f.write(f"Your Answer:\n{answer['user_answer']}\n\n")
-            f.write(f"Score: {answer['score']}/10 ({answer['category']})\n\n")
-            
-            feedback = answer['feedback']
-            f.write(f"Feedback: {feedback.get('main_feedback', '')}\n")
-            f.write(f"What was good: {feedback.get('what_was_good', '')}\n")
-            f.write(f"What was missing: {feedback.get('what_was_missing', '')}\n")
-            f.write(f"How to improve: {feedback.get('how_to_improve', '')}\n\n")
-            f.write(f"Ideal Answer:\n{answer['ideal_answer']}\n\n")
-            f.write("-"*60 + "\n\n")
+        f.write(report)
     
     return True
+
+EXPORT_COLUMNS = [
+    'session_id', 'role', 'level', 'start_time', 'end_time', 'average_score', 'total_questions', 'status',
+    'answer_id', 'question_number', 'question', 'user_answer', 'ideal_answer', 'score', 'scorer_version',
+    'main_feedback', 'what_was_good', 'what_was_missing', 'how_to_improve', 'answered_at'
+]
+
+FEEDBACK_FIELDS = ['main_feedback', 'what_was_good', 'what_was_missing', 'how_to_improve']
+
+def iter_export_rows(since: str = None, until: str = None, role: str = None, status: str = None,
+                     chunk_size: int = 1000):
+    """
+    Yield one flat dict per answer (sessions without answers yield one row
+    with empty answer fields), streaming from the database chunk_size rows
+    at a time. since/until filter on the session start time.
+    """
+    _await_pending_writes()
+    conditions = []
+    params = []
+    for clause, value in (('s.start_time >= ?', since), ('s.start_time < ?', until),
+                          ('s.role = ?', role), ('s.status = ?', status)):
+        if value is not None:
+            conditions.append(clause)
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    cursor = get_connection().execute(f'''
+        SELECT s.session_id, s.role, s.level, s.start_time, s.end_time, s.average_score,
+               s.total_questions, s.status, a.answer_id, a.question_number, a.question,
+               a.user_answer, a.ideal_answer, a.score, a.scorer_version, a.feedback, a.timestamp
+        FROM sessions s
+        LEFT JOIN answer_texts a ON a.session_id = s.session_id
+        {where}
+        ORDER BY s.session_id, a.question_number
+    ''', params)
+    
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            record = dict(zip(EXPORT_COLUMNS[:15], row[:15]))
+            feedback = json.loads(row[15]) if row[15] else {}
+            for field in FEEDBACK_FIELDS:
+                record[field] = feedback.get(field)
+            record['answered_at'] = row[16]
+            yield record
+
+def export_sessions(output_path: str, fmt: str = 'jsonl', since: str = None, until: str = None,
+                    role: str = None, status: str = None, chunk_size: int = 1000) -> int:
+    """
+    Stream sessions and answers to a JSONL, CSV or Parquet file in chunks,
+    so memory use does not grow with history size. Returns the row count.
+    """
+    rows = iter_export_rows(since, until, role, status, chunk_size)
+    count = 0
+    
+    if fmt == 'jsonl':
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for record in rows:
+                f.write(json.dumps(record) + "\n")
+                count += 1
+    elif fmt == 'csv':
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for record in rows:
+                writer.writerow(record)
+                count += 1
+    elif fmt == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+        
+        schema = pa.schema([
+            (name, pa.int64() if name in ('session_id', 'total_questions', 'answer_id', 'question_number', 'scorer_version')
+             else pa.float64() if name in ('average_score', 'score') else pa.string())
+            for name in EXPORT_COLUMNS
+        ])
+        with pq.ParquetWriter(output_path, schema) as writer:
+            chunk = []
+            for record in rows:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                count += len(chunk)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    return count
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Interview history database maintenance.")
+    parser.add_argument('command', choices=['migrate', 'rebuild-stats', 'export'])
+    parser.add_argument('--db', default=DB_PATH, help="Path to the interview history database")
+    parser.add_argument('--tenant', help="Use this tenant's shard instead of --db")
+    parser.add_argument('--output', help="Export: output file")
+    parser.add_argument('--format', default='jsonl', choices=['jsonl', 'csv', 'parquet'], help="Export: file format")
+    parser.add_argument('--since', help="Export: sessions started on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="Export: sessions started before this date (YYYY-MM-DD)")
+    parser.add_argument('--role', help="Export: only this role")
+    parser.add_argument('--status', help="Export: only this status (e.g. completed)")
+    args = parser.parse_args()
+    
+    DB_PATH = tenant_db_path(args.tenant) if args.tenant else args.db
+    if args.command == 'migrate':
+        init_database()
+    elif args.command == 'rebuild-stats':
+        rebuild_statistics()
+    elif args.command == 'export':
+        if not args.output:
+            parser.error("export requires --output")
+        rows = export_sessions(args.output, args.format, args.since, args.until, args.role, args.status)
+        print(f"Exported {rows} rows to {args.output}")
+    print(f"{args.command}: done ({DB_PATH})")
@@ -1,9 +1,181 @@
 from sentence_transformers import SentenceTransformer, util
-import re
+import torch
+from collections import Counter
+from functools import lru_cache
+import math
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+import config
+from config import SCORER_VERSION, CONCEPT_COVERAGE_WEIGHT
+from concept_coverage import concept_coverage, extract_concepts, tokenize, STOP_WORDS
+
+model = SentenceTransformer(config.EMBEDDING_MODEL)
 
 def evaluate_answer(user_answer: str, ideal_answer: str, question: str = "", question_data: dict = None) -> dict:
+    result = _evaluate_without_embedding(user_answer, ideal_answer, question_data)
+    if result is not None:
+        return result
+    
+    user_emb, ideal_emb = encode_texts([user_answer, ideal_answer])
+    similarity = util.pytorch_cos_sim(user_emb, ideal_emb)
+    raw_score = float(similarity)
+    
+    result = _evaluate_from_similarity(raw_score, user_answer, ideal_answer, question_data)
+    result["embedding"] = user_emb.cpu().numpy().astype("float16")
+    return result
+
+def evaluate_answers_batch(items: list, batch_size: int = 64, cascade: bool = False) -> list:
+    # With cascade, answers are settled by the same rule and lexical stages as
+    # evaluate_answer_cascade before the embedding model; there is no LLM stage.
+    results = [None] * len(items)
+    pending = []
+    
+    for i, item in enumerate(items):
+        result = _evaluate_without_embedding(item['user_answer'], item['ideal_answer'], item.get('question_data'))
+        if result is not None:
+            result["stage"] = "rule"
+        elif cascade:
+            result = _evaluate_lexically(item['user_answer'], item['ideal_answer'], item.get('question_data'))
+        if result is not None:
+            results[i] = result
+        else:
+            pending.append(i)
+    
+    if not pending:
+        return results
+    
+    ideal_texts = list(dict.fromkeys(items[i]['ideal_answer'] for i in pending))
+    ideal_index = {text: k for k, text in enumerate(ideal_texts)}
+    
+    user_embs = encode_texts([items[i]['user_answer'] for i in pending], batch_size=batch_size)
+    ideal_embs = encode_texts(ideal_texts, batch_size=batch_size)
+    ideal_embs = ideal_embs[[ideal_index[items[i]['ideal_answer']] for i in pending]]
+    similarities = util.pairwise_cos_sim(user_embs, ideal_embs).tolist()
+    user_vectors = user_embs.cpu().numpy().astype("float16")
+    
+    for k, (i, raw_score) in enumerate(zip(pending, similarities)):
+        item = items[i]
+        results[i] = _evaluate_from_similarity(raw_score, item['user_answer'], item['ideal_answer'], item.get('question_data'))
+        results[i]["embedding"] = user_vectors[k]
+        results[i]["stage"] = "embedding"
+    
+    return results
+
+def encode_texts(texts: list, batch_size: int = 64) -> torch.Tensor:
+    windows = []
+    owners = []
+    for i, text in enumerate(texts):
+        for window in _split_windows(text):
+            windows.append(window)
+            owners.append(i)
+    
+    window_embs = model.encode(windows, batch_size=batch_size, convert_to_tensor=True, normalize_embeddings=True)
+    if len(windows) == len(texts):
+        return window_embs
+    
+    owner_index = torch.tensor(owners, device=window_embs.device)
+    pooled = torch.zeros(len(texts), window_embs.shape[1], device=window_embs.device, dtype=window_embs.dtype)
+    pooled.index_add_(0, owner_index, window_embs)
+    counts = torch.bincount(owner_index, minlength=len(texts)).clamp(min=1).unsqueeze(1)
+    return pooled / counts
+
+def _split_windows(text: str) -> list:
+    tokenizer = model.tokenizer
+    max_tokens = model.max_seq_length - 2
+    tokens = tokenizer.tokenize(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    
+    stride = max(1, max_tokens - config.ENCODING_WINDOW_OVERLAP)
+    starts = list(range(0, len(tokens) - max_tokens, stride)) + [len(tokens) - max_tokens]
+    if len(starts) > config.ENCODING_MAX_WINDOWS:
+        last = len(starts) - 1
+        count = max(1, config.ENCODING_MAX_WINDOWS)
+        starts = [starts[k * last // max(1, count - 1)] for k in range(count)]
+    
+    return [tokenizer.convert_tokens_to_string(tokens[start:start + max_tokens]) for start in starts]
+
+def evaluate_answer_cascade(user_answer: str, ideal_answer: str, question: str = "", question_data: dict = None,
+                            role: str = "", level: str = "", high_stakes: bool = False) -> dict:
+    result = _evaluate_without_embedding(user_answer, ideal_answer, question_data)
+    if result is not None:
+        result["stage"] = "rule"
+        return result
+    
+    if not high_stakes:
+        result = _evaluate_lexically(user_answer, ideal_answer, question_data)
+        if result is not None:
+            return result
+    
+    result = evaluate_answer(user_answer, ideal_answer, question, question_data)
+    result["stage"] = "embedding"
+    
+    band_low, band_high = config.CASCADE_LLM_BAND
+    if config.CASCADE_USE_LLM and (high_stakes or band_low <= result["score"] <= band_high) and config.validate_api_key():
+        try:
+            from ai_engine import evaluate_answer_with_ai
+            llm_result = evaluate_answer_with_ai(question, user_answer, ideal_answer, role, level)
+            if llm_result.get("source") not in ("fallback", "rule-based"):
+                if "is_mcq_correct" in result:
+                    llm_result["is_mcq_correct"] = result["is_mcq_correct"]
+                llm_result["embedding"] = result.get("embedding")
+                llm_result["scorer_version"] = SCORER_VERSION
+                llm_result["stage"] = "llm"
+                return llm_result
+        except Exception as e:
+            print(f"LLM evaluation unavailable, keeping embedding score: {e}")
+    
+    return result
+
+def _evaluate_lexically(user_answer: str, ideal_answer: str, question_data: dict = None):
+    # TF-IDF cosine is not on the embedding similarity scale that
+    # _evaluate_from_similarity is tuned for, so it only settles answers at the
+    # extremes, each with a fixed score; the rest go on to the embedding model.
+    # Terms are not stemmed, so a longer paraphrase can share no terms with the
+    # ideal answer; only short answers are rejected on that evidence.
+    lexical = lexical_similarity(user_answer, ideal_answer)
+    if lexical <= config.CASCADE_LEXICAL_REJECT and len(user_answer.split()) <= config.CASCADE_LEXICAL_REJECT_MAX_WORDS:
+        score = config.CASCADE_LEXICAL_REJECT_SCORE
+    elif lexical >= config.CASCADE_LEXICAL_ACCEPT:
+        score = config.CASCADE_LEXICAL_ACCEPT_SCORE
+    else:
+        return None
+    
+    coverage = concept_coverage(ideal_answer, user_answer)
+    result = _scored_result(score, lexical, coverage, user_answer, ideal_answer, question_data)
+    result["stage"] = "lexical"
+    return result
+
+def lexical_similarity(user_answer: str, ideal_answer: str) -> float:
+    idf, default_idf = _idf_table()
+    user_terms = Counter(t for t in tokenize(user_answer) if t not in STOP_WORDS)
+    ideal_terms = Counter(t for t in tokenize(ideal_answer) if t not in STOP_WORDS)
+    if not user_terms or not ideal_terms:
+        return 0.0
+    
+    def weights(terms):
+        return {t: (1 + math.log(c)) * idf.get(t, default_idf) for t, c in terms.items()}
+    
+    user_weights = weights(user_terms)
+    ideal_weights = weights(ideal_terms)
+    dot = sum(w * ideal_weights[t] for t, w in user_weights.items() if t in ideal_weights)
+    norm = math.sqrt(sum(w * w for w in user_weights.values())) * math.sqrt(sum(w * w for w in ideal_weights.values()))
+    return dot / norm if norm else 0.0
+
+@lru_cache(maxsize=1)
+def _idf_table():
+    from interview_engine import QUESTION_BANK, HR_QUESTIONS
+    
+    documents = [q['ideal_answer'] for levels in QUESTION_BANK.values() for qs in levels.values() for q in qs]
+    documents += [q['ideal_answer'] for qs in HR_QUESTIONS.values() for q in qs]
+    doc_freq = Counter()
+    for doc in documents:
+        doc_freq.update(set(tokenize(doc)))
+    
+    n = len(documents)
+    idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in doc_freq.items()}
+    return idf, math.log(1 + n) + 1
+
+def _evaluate_without_embedding(user_answer: str, ideal_answer: str, question_data: dict = None):
     if not user_answer or len(user_answer.strip()) < 1:
         return {
             "score": 0.5,
@@ -12,7 +184,8 @@ def evaluate_answer(user_answer: str, ideal_answer: str, question: str = "", que
             "what_was_good": "You attempted to answer the question.",
             "what_was_missing": "A comprehensive explanation with key concepts, examples, and details.",
             "how_to_improve": "Provide a detailed answer covering all aspects of the question. Include definitions, examples, and practical applications.",
-            "ideal_answer": ideal_answer
+            "ideal_answer": ideal_answer,
+            "scorer_version": SCORER_VERSION
         }
     
     is_mcq = question_data and 'options' in question_data and 'correct_answer' in question_data
@@ -46,13 +219,18 @@ def evaluate_answer(user_answer: str, ideal_answer: str, question: str = "", que
                 "what_was_missing": what_was_missing,
                 "how_to_improve": how_to_improve,
                 "ideal_answer": ideal_answer,
-                "is_mcq_correct": is_correct if 'is_correct' in locals() else None
+                "is_mcq_correct": is_correct if 'is_correct' in locals() else None,
+                "scorer_version": SCORER_VERSION
             }
     
-    user_emb = model.encode(user_answer, convert_to_tensor=True)
-    ideal_emb = model.encode(ideal_answer, convert_to_tensor=True)
-    similarity = util.pytorch_cos_sim(user_emb, ideal_emb)
-    raw_score = float(similarity)
+    return None
+
+def _evaluate_from_similarity(raw_score: float, user_answer: str, ideal_answer: str, question_data: dict = None) -> dict:
+    is_mcq = question_data and 'options' in question_data and 'correct_answer' in question_data
+    
+    coverage = concept_coverage(ideal_answer, user_answer)
+    if CONCEPT_COVERAGE_WEIGHT:
+        raw_score = (1 - CONCEPT_COVERAGE_WEIGHT) * raw_score + CONCEPT_COVERAGE_WEIGHT * coverage["coverage"]
     
     answer_length = len(user_answer.split())
     ideal_length = len(ideal_answer.split())
@@ -83,9 +261,14 @@ def evaluate_answer(user_answer: str, ideal_answer: str, question: str = "", que
     final_score = min(10, max(0, final_score * 10))
     final_score = round(final_score, 1)
     
+    return _scored_result(final_score, raw_score, coverage, user_answer, ideal_answer, question_data)
+
+def _scored_result(final_score: float, raw_score: float, coverage: dict, user_answer: str, ideal_answer: str,
+                   question_data: dict = None) -> dict:
+    is_mcq = question_data and 'options' in question_data and 'correct_answer' in question_data
     category = categorize_score(final_score)
     
-    feedback = generate_feedback(final_score, user_answer, ideal_answer, raw_score)
+    feedback = generate_feedback(final_score, user_answer, ideal_answer, raw_score, coverage)
     
     result = {
         "score": final_score,
@@ -94,7 +277,9 @@ def evaluate_answer(user_answer: str, ideal_answer: str, question: str = "", que
         "what_was_good": feedback["what_was_good"],
         "what_was_missing": feedback["what_was_missing"],
         "how_to_improve": feedback["how_to_improve"],
-        "ideal_answer": ideal_answer
+        "ideal_answer": ideal_answer,
+        "concept_coverage": round(coverage["coverage"], 2),
+        "scorer_version": SCORER_VERSION
     }
     
     if is_mcq:
@@ -112,7 +297,7 @@ def categorize_score(score: float) -> str:
     else:
         return "Poor"
 
-def generate_feedback(score: float, user_answer: str, ideal_answer: str, similarity: float) -> dict:
+def generate_feedback(score: float, user_answer: str, ideal_answer: str, similarity: float, coverage: dict = None) -> dict:
     feedback = {}
     
     if score >= 8.0:
@@ -132,9 +317,9 @@ def generate_feedback(score: float, user_answer: str, ideal_answer: str, similar
         feedback["what_was_good"] = "You provided a response, which is a starting point."
     
     if score < 8.0:
-        ideal_keywords = extract_key_concepts(ideal_answer)
-        user_keywords = extract_key_concepts(user_answer)
-        missing_concepts = [kw for kw in ideal_keywords if kw not in user_keywords]
+        if coverage is None:
+            coverage = concept_coverage(ideal_answer, user_answer)
+        missing_concepts = coverage["missing"]
         
         if missing_concepts and len(missing_concepts) > 0:
             missing_sample = ", ".join(missing_concepts[:3])
@@ -156,14 +341,9 @@ def generate_feedback(score: float, user_answer: str, ideal_answer: str, similar
     return feedback
 
 def extract_key_concepts(text: str) -> list:
-    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might', 'can', 'it', 'its', 'this', 'that', 'these', 'those'}
-    
-    words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-    key_terms = [word for word in words if word not in common_words and len(word) > 3]
-    
-    return list(set(key_terms))
+    return extract_concepts(text)
 
-def calculate_interview_summary(scores: list, role: str, level: str) -> dict:
+def calculate_interview_summary(scores: list, role: str, level: str, percentile: float = None) -> dict:
     if not scores:
         return {
             "average_score": 0,
@@ -172,6 +352,7 @@ def calculate_interview_summary(scores: list, role: str, level: str) -> dict:
             "average_count": 0,
             "poor_count": 0,
             "overall_performance": "No data",
+            "percentile": None,
             "recommendation": "Complete the interview to get performance summary."
         }
     
@@ -200,5 +381,6 @@ def calculate_interview_summary(scores: list, role: str, level: str) -> dict:
         "average_count": average,
         "poor_count": poor,
         "overall_performance": overall,
+        "percentile": percentile,
         "recommendation": recommendation
     }
@@ -24,7 +24,7 @@ try:
 except Exception as e:
     print(f"Gemini initialization skipped: {e}")
 
-from config import AI_PROVIDER, OPENAI_MODEL
+from config import AI_PROVIDER, OPENAI_MODEL, QUESTION_RETRIEVAL
 
 def generate_ai_question(role: str, level: str, question_number: int, is_hr: bool = False) -> Dict:
     """Generate AI question with proper error handling for missing API keys"""
@@ -324,8 +324,13 @@ HR_QUESTIONS = {
     ]
 }
 
-def generate_question(role: str, level: str, question_number: int = 0, include_hr: bool = True, use_ai: bool = True) -> Dict:
-    """Generate question with fallback to static bank if AI fails"""
+def generate_question(role: str, level: str, question_number: int = 0, include_hr: bool = True, use_ai: bool = True,
+                      asked: List[Tuple[str, float]] = None) -> Dict:
+    """
+    Generate question with fallback to static bank if AI fails. With asked
+    ((question, score) pairs so far), the static question is retrieved by
+    nearness to the candidate's weak areas instead of taken in bank order.
+    """
     is_hr_question = include_hr and question_number % 4 == 0 and question_number > 0
     
     if use_ai:
@@ -336,6 +341,15 @@ def generate_question(role: str, level: str, question_number: int = 0, include_h
         except Exception as e:
             print(f"Falling back to static questions due to error: {e}")
     
+    if asked is not None and QUESTION_RETRIEVAL:
+        try:
+            from question_index import select_question
+            question = select_question(role, level, asked, hr=is_hr_question)
+            if question:
+                return question
+        except Exception as e:
+            print(f"Falling back to bank order, question retrieval failed: {e}")
+    
     # Fallback to static questions
     if is_hr_question:
         questions = HR_QUESTIONS.get(level, HR_QUESTIONS["Easy"])
@@ -0,0 +1,201 @@
+"""
+Retrieval-based question selection.
+Every static-bank question is embedded once with EMBEDDING_MODEL. The
+vectors are cached in EMBEDDING_CACHE_DIR and only new questions are encoded
+later. Questions stored in the history are left out: AI-generated MCQs are
+stored without their options and correct answer, so they could not be asked
+again.
+The next question is the unasked one for the role and level that lies
+closest to the candidate's weak areas (earlier questions weighted by how
+badly they were answered) while staying away from the questions already
+asked. Scoring is a single matrix-vector product over the whole bank, so
+selection takes milliseconds even at 100k+ questions.
+
+Usage: python question_index.py    # build or refresh the cache
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import EMBEDDING_MODEL, EMBEDDING_CACHE_DIR, QUESTION_SHORTLIST_SIZE, QUESTION_NOVELTY_WEIGHT
+from database import question_hash
+
+HR_TOPIC = "HR"
+ENCODE_BATCH_SIZE = 64
+
+_index_lock = threading.Lock()
+_cached_index = {}
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    from evaluation import encode_texts
+
+    vectors = encode_texts(texts, batch_size=ENCODE_BATCH_SIZE).cpu().numpy().astype(np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _question_text(item: Dict) -> str:
+    return f"{item['question']}\n{item.get('ideal_answer') or ''}"
+
+
+class QuestionIndex:
+    """
+    Normalized question embeddings, stored sorted by role and level so each
+    role's and each (role, level)'s questions are one contiguous block of
+    rows that is scored without copying.
+    """
+
+    def __init__(self, items: List[Dict], roles: Sequence[str], levels: Sequence[str], matrix: np.ndarray):
+        roles = np.asarray(roles, dtype=str)
+        levels = np.asarray(levels, dtype=str)
+        order = np.lexsort((levels, roles))
+        self.items = [items[i] for i in order]
+        self.roles = roles[order]
+        self.levels = levels[order]
+        self.matrix = np.ascontiguousarray(np.asarray(matrix, dtype=np.float32)[order])
+        self.rows_by_text = {item['question']: row for row, item in enumerate(self.items)}
+
+        self.spans = {}
+        for row, key in enumerate(zip(self.roles.tolist(), self.levels.tolist())):
+            for span_key in (key, key[0]):
+                start, _ = self.spans.get(span_key, (row, row))
+                self.spans[span_key] = (start, row + 1)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _vectors(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of texts, from the index where possible and encoded otherwise."""
+        vectors = np.zeros((len(texts), self.matrix.shape[1]), dtype=np.float32)
+        missing = []
+        for i, text in enumerate(texts):
+            row = self.rows_by_text.get(text)
+            if row is None:
+                missing.append(i)
+            else:
+                vectors[i] = self.matrix[row]
+        if missing:
+            try:
+                vectors[missing] = _encode([texts[i] for i in missing])
+            except ImportError as e:
+                print(f"Cannot encode questions outside the index: {e}")
+        return vectors
+
+    def select(self, role: str, level: str, asked: List[Tuple[str, Optional[float]]], hr: bool = False,
+               rng: np.random.Generator = None) -> Optional[Dict]:
+        """
+        The best unasked question for role and level (any level if none is
+        left), or None. asked holds (question, score) pairs for the questions
+        so far; score is None for unanswered ones.
+        """
+        rng = rng or np.random.default_rng()
+        group = HR_TOPIC if hr else role
+        asked_rows = [self.rows_by_text[text] for text, _ in asked if text in self.rows_by_text]
+        for span_key in ((group, level), group):
+            if span_key not in self.spans:
+                continue
+            start, end = self.spans[span_key]
+            available = np.ones(end - start, dtype=bool)
+            available[[row - start for row in asked_rows if start <= row < end]] = False
+            if available.any():
+                break
+        else:
+            return None
+        block = self.matrix[start:end]
+
+        asked_vectors = self._vectors([text for text, _ in asked]) if asked else None
+        weights = np.array([(10.0 - score) / 10.0 if score is not None else 0.0 for _, score in asked], dtype=np.float32)
+        if asked and weights.sum() > 0:
+            # Pull towards the topics of badly answered questions
+            target = weights @ asked_vectors
+            relevance = block @ (target / max(np.linalg.norm(target), 1e-12))
+        else:
+            relevance = rng.random(end - start, dtype=np.float32)
+        relevance[~available] = -np.inf
+
+        shortlist_size = min(QUESTION_SHORTLIST_SIZE, int(available.sum()))
+        shortlist = np.argpartition(-relevance, shortlist_size - 1)[:shortlist_size]
+        score = relevance[shortlist]
+        if asked:
+            # Push away from the question closest to one already asked
+            score = score - QUESTION_NOVELTY_WEIGHT * (block[shortlist] @ asked_vectors.T).max(axis=1)
+        return self.items[start + int(shortlist[np.argmax(score)])]
+
+
+def _bank_questions() -> List[Tuple[Dict, str, str]]:
+    from interview_engine import QUESTION_BANK, HR_QUESTIONS
+
+    entries = [(q, role, level) for role, levels in QUESTION_BANK.items() for level, qs in levels.items() for q in qs]
+    entries += [(q, HR_TOPIC, level) for level, qs in HR_QUESTIONS.items() for q in qs]
+    return entries
+
+
+def _load_vectors(entries: List[Tuple[Dict, str, str]], cache_dir: str) -> np.ndarray:
+    """Embeddings for entries, reusing cached vectors by content hash and encoding the rest."""
+    keys = np.array([question_hash(item['question'], item.get('ideal_answer')).hex() for item, _, _ in entries])
+    path = os.path.join(cache_dir, f"questions-{EMBEDDING_MODEL.replace('/', '_')}.npz")
+
+    cached = {}
+    if os.path.exists(path):
+        with np.load(path) as data:
+            cached = dict(zip(data['keys'].tolist(), data['vectors']))
+    missing = [i for i, key in enumerate(keys.tolist()) if key not in cached]
+    if not missing and len(cached) == len(keys):
+        return np.stack([cached[key] for key in keys.tolist()]).astype(np.float32)
+
+    if missing:
+        print(f"Encoding {len(missing)} questions for the question index")
+        for i, vector in zip(missing, _encode([_question_text(entries[i][0]) for i in missing])):
+            cached[keys[i]] = vector.astype(np.float16)
+    vectors = np.stack([cached[key] for key in keys.tolist()])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written under a temporary name and renamed, so readers never see half a file
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, keys=keys, vectors=vectors.astype(np.float16))
+    os.replace(path + '.tmp', path)
+    return vectors.astype(np.float32)
+
+
+def get_question_index(cache_dir: str = EMBEDDING_CACHE_DIR) -> QuestionIndex:
+    """The index of the static bank, built on first use."""
+    with _index_lock:
+        index = _cached_index.get(cache_dir)
+        if index is None:
+            entries = _bank_questions()
+            index = QuestionIndex(
+                [item for item, _, _ in entries],
+                [role for _, role, _ in entries],
+                [level for _, _, level in entries],
+                _load_vectors(entries, cache_dir)
+            )
+            _cached_index[cache_dir] = index
+        return index
+
+
+def select_question(role: str, level: str, asked: List[Tuple[str, Optional[float]]], hr: bool = False) -> Optional[Dict]:
+    return get_question_index().select(role, level, asked, hr)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build or refresh the question embedding index.")
+    parser.add_argument('--cache-dir', default=EMBEDDING_CACHE_DIR, help="Directory for the cached vectors")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    index = get_question_index(args.cache_dir)
+    print(f"{len(index)} questions indexed in {time.perf_counter() - t0:.1f}s")
+
+    role, level = index.roles[0], index.levels[0]
+    t0 = time.perf_counter()
+    question = index.select(role, level, [(index.items[0]['question'], 3.0)])
+    print(f"Sample selection for {role} ({level}) in {(time.perf_counter() - t0) * 1000:.1f} ms: {question['question'] if question else None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Offline re-scoring job for stored answers.
+Streams the answers table in keyset-ordered chunks, scores each chunk in a
+worker process with batched encoding, and writes the new scores back one
+transaction per chunk together with a resume checkpoint. Materialized
+statistics are rebuilt once the run finishes.
+
+Answers go through the same rule, lexical and embedding stages as in the
+app. The LLM stage is not re-run, so answers the LLM graded keep their
+scores.
+
+Usage: python rescore.py [--db PATH] [--chunk-size N] [--workers N] [--restart]
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import SCORER_VERSION, RESCORE_CHUNK_SIZE, RESCORE_WORKERS
+from database import DB_PATH, feedback_to_json, compress_text, store_embedding, get_connection, transaction, rebuild_statistics
+
+MCQ_ANSWER_PATTERN = re.compile(r'^\s*[A-Da-d]\s*($|\n\nExplanation: )')
+
+
+def _static_question_lookup() -> Dict[str, dict]:
+    from interview_engine import QUESTION_BANK, HR_QUESTIONS
+
+    lookup = {}
+    for levels in QUESTION_BANK.values():
+        for questions in levels.values():
+            for question in questions:
+                lookup[question['question']] = question
+    for questions in HR_QUESTIONS.values():
+        for question in questions:
+            lookup[question['question']] = question
+    return lookup
+
+
+def _score_chunk(rows: List[tuple]) -> Tuple[List[tuple], List[tuple]]:
+    from evaluation import evaluate_answers_batch
+
+    items = [
+        {
+            'user_answer': user_answer,
+            'ideal_answer': ideal_answer or '',
+            'question': question,
+            'question_data': question_data
+        }
+        for _, _, question, user_answer, ideal_answer, question_data in rows
+    ]
+    evaluations = evaluate_answers_batch(items, cascade=True)
+    updates = [
+        (evaluation['score'], compress_text(feedback_to_json(evaluation)), SCORER_VERSION, evaluation.get('stage'), row[0])
+        for row, evaluation in zip(rows, evaluations)
+    ]
+    # None drops an embedding left over from an earlier embedding-stage score
+    embeddings = [(row[0], evaluation.get('embedding')) for row, evaluation in zip(rows, evaluations)]
+    return updates, embeddings
+
+
+def _ensure_progress_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rescore_progress (
+            scorer_version INTEGER PRIMARY KEY,
+            last_answer_id INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _load_checkpoint(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        'SELECT last_answer_id FROM rescore_progress WHERE scorer_version = ?',
+        (SCORER_VERSION,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def _read_chunk(conn: sqlite3.Connection, after_id: int, chunk_size: int) -> List[tuple]:
+    return conn.execute('''
+        SELECT t.answer_id, t.session_id, t.question, t.user_answer, t.ideal_answer
+        FROM answer_texts t
+        JOIN answers a ON a.answer_id = t.answer_id
+        WHERE t.answer_id > ?
+          AND (t.scorer_version IS NULL OR t.scorer_version <> ?)
+          AND a.scoring_stage IS NOT 'llm'
+        ORDER BY t.answer_id
+        LIMIT ?
+    ''', (after_id, SCORER_VERSION, chunk_size)).fetchall()
+
+
+def _prepare_rows(rows: List[tuple], static_questions: Dict[str, dict]):
+    """
+    Attach MCQ metadata where the question comes from the static bank.
+    MCQ answers to AI-generated questions cannot be re-graded because the
+    correct option was never stored, so their scores are left untouched.
+    """
+    prepared = []
+    skipped = 0
+    for answer_id, session_id, question, user_answer, ideal_answer in rows:
+        question_data = static_questions.get(question)
+        if question_data is None and MCQ_ANSWER_PATTERN.match(user_answer or ''):
+            skipped += 1
+            continue
+        prepared.append((answer_id, session_id, question, user_answer, ideal_answer, question_data))
+    return prepared, skipped
+
+
+def _write_chunk(conn: sqlite3.Connection, updates: List[tuple], embeddings: List[tuple],
+                 session_ids: List[int], last_answer_id: int):
+    with transaction(conn):
+        conn.executemany('''
+            UPDATE answers
+            SET score = ?, feedback = ?, scorer_version = ?, scoring_stage = ?
+            WHERE answer_id = ?
+        ''', updates)
+        for answer_id, embedding in embeddings:
+            if embedding is None:
+                conn.execute('DELETE FROM answer_embeddings WHERE answer_id = ?', (answer_id,))
+            else:
+                store_embedding(conn, answer_id, embedding)
+        conn.execute('''
+            UPDATE sessions
+            SET average_score = (
+                SELECT AVG(score) FROM answers WHERE answers.session_id = sessions.session_id
+            )
+            WHERE status = 'completed'
+              AND session_id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(session_ids),))
+        conn.execute('''
+            INSERT INTO rescore_progress (scorer_version, last_answer_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(scorer_version) DO UPDATE SET
+                last_answer_id = excluded.last_answer_id,
+                updated_at = excluded.updated_at
+        ''', (SCORER_VERSION, last_answer_id))
+
+
+def rescore_answers(db_path: str = DB_PATH, chunk_size: int = RESCORE_CHUNK_SIZE,
+                    workers: int = RESCORE_WORKERS, restart: bool = False) -> dict:
+    """
+    Re-score every answer not yet scored by the current SCORER_VERSION,
+    except those the LLM stage decided.
+
+    At most two chunks per worker are in flight, so memory stays bounded by
+    chunk_size regardless of table size. Results are committed in read order,
+    which keeps the checkpoint monotonic: an interrupted run resumes after
+    the last committed chunk.
+    """
+    conn = get_connection(db_path)
+    _ensure_progress_table(conn)
+
+    if restart:
+        with transaction(conn):
+            conn.execute('DELETE FROM rescore_progress WHERE scorer_version = ?', (SCORER_VERSION,))
+
+    static_questions = _static_question_lookup()
+    last_read_id = _load_checkpoint(conn)
+    stats = {'rescored': 0, 'skipped': 0, 'chunks': 0, 'resumed_from': last_read_id}
+
+    in_flight = deque()
+    max_in_flight = max(1, workers) * 2
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        exhausted = False
+        while not exhausted or in_flight:
+            while not exhausted and len(in_flight) < max_in_flight:
+                rows = _read_chunk(conn, last_read_id, chunk_size)
+                if not rows:
+                    exhausted = True
+                    break
+                last_read_id = rows[-1][0]
+                prepared, skipped = _prepare_rows(rows, static_questions)
+                stats['skipped'] += skipped
+                session_ids = sorted({row[1] for row in prepared})
+                future = pool.submit(_score_chunk, prepared) if prepared else None
+                in_flight.append((future, session_ids, last_read_id))
+
+            if not in_flight:
+                break
+
+            future, session_ids, chunk_last_id = in_flight.popleft()
+            updates, embeddings = future.result() if future else ([], [])
+            _write_chunk(conn, updates, embeddings, session_ids, chunk_last_id)
+            stats['rescored'] += len(updates)
+            stats['chunks'] += 1
+            print(f"Rescored {stats['rescored']} answers (through answer_id {chunk_last_id})")
+
+    if stats['rescored']:
+        rebuild_statistics(db_path)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Re-score stored answers with the current scorer version.")
+    parser.add_argument('--db', default=DB_PATH, help="Path to the interview history database")
+    parser.add_argument('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE, help="Answers per chunk")
+    parser.add_argument('--workers', type=int, default=RESCORE_WORKERS, help="Scoring processes")
+    parser.add_argument('--restart', action='store_true', help="Ignore the saved checkpoint")
+    args = parser.parse_args(argv)
+
+    stats = rescore_answers(args.db, args.chunk_size, args.workers, args.restart)
+    print(f"Done: {stats['rescored']} rescored, {stats['skipped']} skipped, "
+          f"{stats['chunks']} chunks (resumed after answer_id {stats['resumed_from']}), "
+          f"scorer version {SCORER_VERSION}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Retention job for interview history.
+Sessions started more than RETENTION_DAYS ago are appended to a gzip JSONL
+archive, one gzip member per session, and deleted from the live database in
+batches. archived_sessions records where each one went, so
+database.get_session_details keeps returning them, and the statistics still
+count them. Freed pages are returned to the filesystem with incremental
+vacuum.
+
+Usage: python retention.py [--db PATH] [--days N] [--archive-dir DIR] [--batch-size N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from config import RETENTION_DAYS, ARCHIVE_DIR, RETENTION_BATCH_SIZE
+import database
+from database import get_connection, transaction, get_sessions_details
+
+
+def _expired_session_ids(conn: sqlite3.Connection, days: int, limit: int) -> List[int]:
+    return [row[0] for row in conn.execute('''
+        SELECT session_id
+        FROM sessions
+        WHERE start_time < datetime('now', ?)
+        ORDER BY start_time, session_id
+        LIMIT ?
+    ''', (f'-{int(days)} days', limit))]
+
+
+def _archive_batch(f, archive_file: str, sessions: List[dict]) -> List[tuple]:
+    entries = []
+    for session in sessions:
+        offset = f.tell()
+        member = gzip.compress((json.dumps(session) + '\n').encode('utf-8'))
+        f.write(member)
+        entries.append((
+            session['session_id'],
+            session['role'],
+            session['level'],
+            session['start_time'],
+            session['status'],
+            session['average_score'],
+            archive_file,
+            offset,
+            len(member)
+        ))
+    # The rows must be durable on disk before they leave the database
+    f.flush()
+    os.fsync(f.fileno())
+    return entries
+
+
+def _remove_archived(conn: sqlite3.Connection, entries: List[tuple]):
+    with transaction(conn):
+        conn.executemany('''
+            INSERT OR REPLACE INTO archived_sessions
+                (session_id, role, level, start_time, status, average_score,
+                 archive_file, archive_offset, archive_length)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', entries)
+        # answers go with the session through ON DELETE CASCADE. The statistics
+        # aggregates are left alone: archived sessions still count.
+        conn.execute(
+            'DELETE FROM sessions WHERE session_id IN (SELECT value FROM json_each(?))',
+            (json.dumps([entry[0] for entry in entries]),)
+        )
+
+
+def compact(conn: sqlite3.Connection) -> int:
+    """
+    Return free pages to the filesystem. A database created before
+    auto_vacuum=INCREMENTAL was set needs one full VACUUM to switch over.
+    Returns the number of free pages released.
+    """
+    before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+    else:
+        # Through execute() the pragma frees one page per step; executescript
+        # runs it to completion
+        conn.executescript('PRAGMA incremental_vacuum')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+
+def run_retention(db_path: str = None, days: int = RETENTION_DAYS, archive_dir: str = ARCHIVE_DIR,
+                  batch_size: int = RETENTION_BATCH_SIZE) -> dict:
+    db_path = db_path or database.current_db_path()
+    conn = get_connection(db_path)
+    stats = {'archived': 0, 'batches': 0, 'archive_file': None, 'pages_freed': 0}
+
+    session_ids = _expired_session_ids(conn, days, batch_size)
+    if session_ids:
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_file = os.path.join(archive_dir, f"sessions-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl.gz")
+        stats['archive_file'] = archive_file
+
+        with open(archive_file, 'ab') as f:
+            while session_ids:
+                details = get_sessions_details(session_ids, db_path=db_path)
+                sessions = [details[session_id] for session_id in session_ids if session_id in details]
+                _remove_archived(conn, _archive_batch(f, archive_file, sessions))
+                stats['archived'] += len(sessions)
+                stats['batches'] += 1
+                print(f"Archived {stats['archived']} sessions to {archive_file}")
+                session_ids = _expired_session_ids(conn, days, batch_size)
+
+    stats['pages_freed'] = compact(conn)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Archive old interview sessions and compact the database.")
+    parser.add_argument('--db', default=database.DB_PATH, help="Path to the interview history database")
+    parser.add_argument('--days', type=int, default=RETENTION_DAYS, help="Archive sessions older than this many days")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help="Directory for archive files")
+    parser.add_argument('--batch-size', type=int, default=RETENTION_BATCH_SIZE, help="Sessions per delete batch")
+    args = parser.parse_args(argv)
+
+    stats = run_retention(args.db, args.days, args.archive_dir, args.batch_size)
+    print(f"Done: {stats['archived']} sessions archived in {stats['batches']} batches"
+          + (f" to {stats['archive_file']}" if stats['archive_file'] else "")
+          + f", {stats['pages_freed']} pages freed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,655 @@
+"""
+Pluggable storage for interview history.
+StorageBackend defines the operations the app needs; SQLiteStorage keeps the
+single-file behaviour of database.py and PostgresStorage shares one history
+across several app nodes through a connection pool. get_storage() picks the
+backend from config.STORAGE_BACKEND.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import config
+import database
+from database import AnswerSummary, SESSION_COLUMNS
+
+try:
+    import psycopg2
+    from psycopg2.pool import ThreadedConnectionPool
+except ImportError:
+    psycopg2 = None
+
+
+class StorageBackend(ABC):
+
+    @abstractmethod
+    def create_session(self, role: str, level: str) -> int: ...
+
+    @abstractmethod
+    def save_answer(self, session_id: int, question_number: int, question: str,
+                    user_answer: str, ideal_answer: str, evaluation: dict): ...
+
+    @abstractmethod
+    def complete_session(self, session_id: int, average_score: float, total_questions: int): ...
+
+    @abstractmethod
+    def delete_session(self, session_id: int): ...
+
+    @abstractmethod
+    def get_session_history(self, limit: int = None) -> list: ...
+
+    @abstractmethod
+    def get_session_page(self, cursor: Optional[Tuple[str, int]] = None,
+                         page_size: int = 20) -> Tuple[list, Optional[Tuple[str, int]]]: ...
+
+    @abstractmethod
+    def get_session_details(self, session_id: int) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def get_sessions_details(self, session_ids: List[int], summaries: bool = False) -> Dict[int, Dict]: ...
+
+    @abstractmethod
+    def get_statistics(self) -> Dict: ...
+
+    @abstractmethod
+    def get_score_timeseries(self, role: str = None, level: str = None, since: str = None,
+                             until: str = None, bucket: str = 'day') -> List[Dict]: ...
+
+    @abstractmethod
+    def search_answers(self, query: str, role: str = None, level: str = None,
+                       offset: int = 0, page_size: int = 20) -> Tuple[List[Dict], Optional[int]]: ...
+
+    @abstractmethod
+    def get_score_percentile(self, score: float, role: str = None, level: str = None) -> Optional[float]: ...
+
+    @abstractmethod
+    def get_score_distribution(self, role: str = None, level: str = None) -> Dict: ...
+
+    def save_answer_deferred(self, session_id: int, question_number: int, question: str,
+                             user_answer: str, ideal_answer: str, evaluation: dict):
+        self.save_answer(session_id, question_number, question, user_answer, ideal_answer, evaluation)
+
+    def complete_session_deferred(self, session_id: int, average_score: float, total_questions: int):
+        self.complete_session(session_id, average_score, total_questions)
+
+    def render_session_report(self, session_id: int) -> Optional[str]:
+        session = self.get_session_details(session_id)
+        return database.format_session_report(session) if session else None
+
+
+class SQLiteStorage(StorageBackend):
+    """The database.py implementation, unchanged."""
+
+    def create_session(self, role, level):
+        return database.create_session(role, level)
+
+    def save_answer(self, session_id, question_number, question, user_answer, ideal_answer, evaluation):
+        database.save_answer(session_id, question_number, question, user_answer, ideal_answer, evaluation)
+
+    def save_answer_deferred(self, session_id, question_number, question, user_answer, ideal_answer, evaluation):
+        database.save_answer_deferred(session_id, question_number, question, user_answer, ideal_answer, evaluation)
+
+    def complete_session(self, session_id, average_score, total_questions):
+        database.complete_session(session_id, average_score, total_questions)
+
+    def complete_session_deferred(self, session_id, average_score, total_questions):
+        database.complete_session_deferred(session_id, average_score, total_questions)
+
+    def delete_session(self, session_id):
+        database.delete_session(session_id)
+
+    def get_session_history(self, limit=None):
+        return database.get_session_history(limit)
+
+    def get_session_page(self, cursor=None, page_size=20):
+        return database.get_session_page(cursor, page_size)
+
+    def get_session_details(self, session_id):
+        return database.get_session_details(session_id)
+
+    def get_sessions_details(self, session_ids, summaries=False):
+        return database.get_sessions_details(session_ids, summaries)
+
+    def get_statistics(self):
+        return database.get_statistics()
+
+    def get_score_timeseries(self, role=None, level=None, since=None, until=None, bucket='day'):
+        return database.get_score_timeseries(role, level, since, until, bucket)
+
+    def search_answers(self, query, role=None, level=None, offset=0, page_size=20):
+        return database.search_answers(query, role, level, offset, page_size)
+
+    def get_score_percentile(self, score, role=None, level=None):
+        return database.get_score_percentile(score, role, level)
+
+    def get_score_distribution(self, role=None, level=None):
+        return database.get_score_distribution(role, level)
+
+    def render_session_report(self, session_id):
+        return database.render_session_report(session_id)
+
+
+# Timestamps are returned as text, matching what the SQLite backend gives the app
+PG_SESSION_COLUMNS = SESSION_COLUMNS.replace(
+    'start_time, end_time',
+    "to_char(start_time, 'YYYY-MM-DD HH24:MI:SS'), to_char(end_time, 'YYYY-MM-DD HH24:MI:SS')"
+)
+
+PG_SEARCH_DOCUMENT = "coalesce(question, '') || ' ' || coalesce(user_answer, '') || ' ' || coalesce(feedback, '')"
+
+PG_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id BIGSERIAL PRIMARY KEY,
+        role TEXT NOT NULL,
+        level TEXT NOT NULL,
+        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        end_time TIMESTAMP,
+        average_score DOUBLE PRECISION,
+        total_questions INTEGER,
+        status TEXT DEFAULT 'in_progress'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS answers (
+        answer_id BIGSERIAL PRIMARY KEY,
+        session_id BIGINT REFERENCES sessions(session_id) ON DELETE CASCADE,
+        question_number INTEGER,
+        question TEXT,
+        user_answer TEXT,
+        ideal_answer TEXT,
+        score DOUBLE PRECISION,
+        feedback TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        scorer_version INTEGER,
+        scoring_stage TEXT
+    )
+    ''',
+    'ALTER TABLE answers ADD COLUMN IF NOT EXISTS scoring_stage TEXT',
+    'CREATE INDEX IF NOT EXISTS idx_answers_session ON answers(session_id, question_number)',
+    'CREATE INDEX IF NOT EXISTS idx_sessions_status_start ON sessions(status, start_time)',
+    'CREATE INDEX IF NOT EXISTS idx_sessions_start_id ON sessions(start_time, session_id)',
+    f"CREATE INDEX IF NOT EXISTS idx_answers_search ON answers USING GIN (to_tsvector('english', {PG_SEARCH_DOCUMENT}))",
+]
+
+PG_DAILY_ROLLUP_SELECT = '''
+    SELECT start_time::date, role, level, COUNT(*), COUNT(average_score),
+           COALESCE(SUM(average_score), 0), COALESCE(SUM(average_score * average_score), 0),
+           MIN(average_score), MAX(average_score)
+    FROM sessions
+    WHERE status = 'completed'
+'''
+
+# Aggregates kept in step with completed sessions, as database.py does for
+# SQLite. Each entry is created and filled from the existing sessions the
+# first time a node starts against a database that does not have it yet.
+PG_AGGREGATES = [
+    ('stats_totals', [
+        '''
+        CREATE TABLE stats_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            session_count BIGINT NOT NULL DEFAULT 0,
+            scored_count BIGINT NOT NULL DEFAULT 0,
+            score_sum DOUBLE PRECISION NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE stats_by_role (
+            role TEXT PRIMARY KEY,
+            session_count BIGINT NOT NULL DEFAULT 0,
+            scored_count BIGINT NOT NULL DEFAULT 0,
+            score_sum DOUBLE PRECISION NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        INSERT INTO stats_totals (id, session_count, scored_count, score_sum)
+        SELECT 1, COUNT(*), COUNT(average_score), COALESCE(SUM(average_score), 0)
+        FROM sessions
+        WHERE status = 'completed'
+        ''',
+        '''
+        INSERT INTO stats_by_role (role, session_count, scored_count, score_sum)
+        SELECT role, COUNT(*), COUNT(average_score), COALESCE(SUM(average_score), 0)
+        FROM sessions
+        WHERE status = 'completed'
+        GROUP BY role
+        ''',
+    ]),
+    ('stats_daily', [
+        '''
+        CREATE TABLE stats_daily (
+            day DATE NOT NULL,
+            role TEXT NOT NULL,
+            level TEXT NOT NULL,
+            session_count BIGINT NOT NULL DEFAULT 0,
+            scored_count BIGINT NOT NULL DEFAULT 0,
+            score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            score_sq_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            score_min DOUBLE PRECISION,
+            score_max DOUBLE PRECISION,
+            PRIMARY KEY (day, role, level)
+        )
+        ''',
+        f'''
+        INSERT INTO stats_daily (day, role, level, session_count, scored_count, score_sum, score_sq_sum, score_min, score_max)
+        {PG_DAILY_ROLLUP_SELECT}
+        GROUP BY 1, 2, 3
+        ''',
+    ]),
+    ('score_histogram', [
+        '''
+        CREATE TABLE score_histogram (
+            role TEXT NOT NULL,
+            level TEXT NOT NULL,
+            bin INTEGER NOT NULL,
+            count BIGINT NOT NULL,
+            PRIMARY KEY (role, level, bin)
+        )
+        ''',
+        '''
+        INSERT INTO score_histogram (role, level, bin, count)
+        SELECT role, level, FLOOR(LEAST(GREATEST(average_score, 0), 10) * 10 + 0.5)::int, COUNT(*)
+        FROM sessions
+        WHERE status = 'completed' AND average_score IS NOT NULL
+        GROUP BY 1, 2, 3
+        ''',
+    ]),
+]
+
+# Advisory lock key held while a node sets up the schema
+PG_SCHEMA_LOCK = 0x696e7476
+
+
+class PostgresStorage(StorageBackend):
+    """Shared history in PostgreSQL, one pooled connection per operation."""
+
+    def __init__(self, dsn: str = None, min_connections: int = None, max_connections: int = None):
+        if psycopg2 is None:
+            raise ImportError("PostgreSQL storage requires psycopg2: pip install psycopg2-binary")
+        self._pool = ThreadedConnectionPool(
+            min_connections or config.POSTGRES_POOL_MIN,
+            max_connections or config.POSTGRES_POOL_MAX,
+            dsn or config.POSTGRES_DSN
+        )
+        with self._connection() as conn, conn.cursor() as cur:
+            # Nodes starting together would otherwise race to create and fill the aggregates
+            cur.execute('SELECT pg_advisory_xact_lock(%s)', (PG_SCHEMA_LOCK,))
+            for statement in PG_SCHEMA:
+                cur.execute(statement)
+            for table, statements in PG_AGGREGATES:
+                cur.execute('SELECT to_regclass(%s)', (table,))
+                if cur.fetchone()[0] is None:
+                    for statement in statements:
+                        cur.execute(statement)
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.putconn(conn)
+
+    def close(self):
+        self._pool.closeall()
+
+    def create_session(self, role, level):
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute('''
+                INSERT INTO sessions (role, level, status)
+                VALUES (%s, %s, 'in_progress')
+                RETURNING session_id
+            ''', (role, level))
+            return cur.fetchone()[0]
+
+    def save_answer(self, session_id, question_number, question, user_answer, ideal_answer, evaluation):
+        # No MinHash signature is stored: near-duplicate detection
+        # (answer_similarity.py) only covers the SQLite backend
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute('''
+                INSERT INTO answers (session_id, question_number, question, user_answer,
+                                     ideal_answer, score, feedback, scorer_version, scoring_stage)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ''', (
+                session_id,
+                question_number,
+                question,
+                user_answer,
+                ideal_answer,
+                evaluation.get('score', 0),
+                database.feedback_to_json(evaluation),
+                evaluation.get('scorer_version'),
+                evaluation.get('stage')
+            ))
+
+    def complete_session(self, session_id, average_score, total_questions):
+        with self._connection() as conn, conn.cursor() as cur:
+            # FOR UPDATE makes a concurrent completion of the same session wait,
+            # so the aggregates see each change exactly once
+            cur.execute('''
+                SELECT role, status, average_score, level, start_time::date
+                FROM sessions
+                WHERE session_id = %s
+                FOR UPDATE
+            ''', (session_id,))
+            previous = cur.fetchone()
+            if previous is None:
+                return
+
+            cur.execute('''
+                UPDATE sessions
+                SET end_time = CURRENT_TIMESTAMP,
+                    average_score = %s,
+                    total_questions = %s,
+                    status = 'completed'
+                WHERE session_id = %s
+            ''', (average_score, total_questions, session_id))
+
+            role, status, old_score, level, day = previous
+            if status == 'completed':
+                self._adjust_statistics(cur, role, -1, old_score)
+                self._adjust_score_histogram(cur, role, level, -1, old_score)
+                self._refresh_daily_rollup(cur, day, role, level)
+            else:
+                self._add_to_daily_rollup(cur, day, role, level, average_score)
+            self._adjust_statistics(cur, role, 1, average_score)
+            self._adjust_score_histogram(cur, role, level, 1, average_score)
+
+    def delete_session(self, session_id):
+        with self._connection() as conn, conn.cursor() as cur:
+            # answers go with the session through ON DELETE CASCADE
+            cur.execute('''
+                DELETE FROM sessions
+                WHERE session_id = %s
+                RETURNING role, status, average_score, level, start_time::date
+            ''', (session_id,))
+            row = cur.fetchone()
+            if row and row[1] == 'completed':
+                self._adjust_statistics(cur, row[0], -1, row[2])
+                self._adjust_score_histogram(cur, row[0], row[3], -1, row[2])
+                self._refresh_daily_rollup(cur, row[4], row[0], row[3])
+
+    def _adjust_statistics(self, cur, role, sign, score):
+        scored = sign if score is not None else 0
+        score_delta = sign * score if score is not None else 0.0
+        cur.execute('''
+            UPDATE stats_totals
+            SET session_count = session_count + %s, scored_count = scored_count + %s, score_sum = score_sum + %s
+            WHERE id = 1
+        ''', (sign, scored, score_delta))
+        cur.execute('''
+            INSERT INTO stats_by_role (role, session_count, scored_count, score_sum)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (role) DO UPDATE SET
+                session_count = stats_by_role.session_count + excluded.session_count,
+                scored_count = stats_by_role.scored_count + excluded.scored_count,
+                score_sum = stats_by_role.score_sum + excluded.score_sum
+        ''', (role, sign, scored, score_delta))
+        cur.execute('DELETE FROM stats_by_role WHERE role = %s AND session_count <= 0', (role,))
+
+    def _adjust_score_histogram(self, cur, role, level, sign, score):
+        if score is None:
+            return
+        cur.execute('''
+            INSERT INTO score_histogram (role, level, bin, count)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (role, level, bin) DO UPDATE SET count = score_histogram.count + excluded.count
+        ''', (role, level, database._score_bin(score), sign))
+        cur.execute('DELETE FROM score_histogram WHERE role = %s AND level = %s AND count <= 0', (role, level))
+
+    def _add_to_daily_rollup(self, cur, day, role, level, score):
+        # LEAST and GREATEST skip NULLs, so an unscored session leaves min/max alone
+        cur.execute('''
+            INSERT INTO stats_daily (day, role, level, session_count, scored_count, score_sum, score_sq_sum, score_min, score_max)
+            VALUES (%s, %s, %s, 1, %s, %s, %s, %s, %s)
+            ON CONFLICT (day, role, level) DO UPDATE SET
+                session_count = stats_daily.session_count + 1,
+                scored_count = stats_daily.scored_count + excluded.scored_count,
+                score_sum = stats_daily.score_sum + excluded.score_sum,
+                score_sq_sum = stats_daily.score_sq_sum + excluded.score_sq_sum,
+                score_min = LEAST(stats_daily.score_min, excluded.score_min),
+                score_max = GREATEST(stats_daily.score_max, excluded.score_max)
+        ''', (
+            day, role, level,
+            1 if score is not None else 0,
+            score or 0.0,
+            score * score if score is not None else 0.0,
+            score,
+            score
+        ))
+
+    def _refresh_daily_rollup(self, cur, day, role, level):
+        # Recomputed from that day's sessions, since min/max cannot be decremented
+        cur.execute('DELETE FROM stats_daily WHERE day = %s AND role = %s AND level = %s', (day, role, level))
+        cur.execute(f'''
+            INSERT INTO stats_daily (day, role, level, session_count, scored_count, score_sum, score_sq_sum, score_min, score_max)
+            {PG_DAILY_ROLLUP_SELECT}
+              AND start_time >= %s AND start_time < %s + 1 AND role = %s AND level = %s
+            GROUP BY 1, 2, 3
+        ''', (day, day, role, level))
+
+    def get_session_history(self, limit=None):
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(f'''
+                SELECT {PG_SESSION_COLUMNS}
+                FROM sessions
+                ORDER BY start_time DESC
+                LIMIT %s
+            ''', (limit,))
+            return [database._session_from_row(row) for row in cur.fetchall()]
+
+    def get_session_page(self, cursor=None, page_size=20):
+        # The displayed start_time drops the microseconds, so the cursor carries
+        # the full-precision value instead; otherwise sessions started in the
+        # same second as the page boundary would be skipped
+        with self._connection() as conn, conn.cursor() as cur:
+            if cursor is None:
+                cur.execute(f'''
+                    SELECT {PG_SESSION_COLUMNS}, start_time::text
+                    FROM sessions
+                    ORDER BY start_time DESC, session_id DESC
+                    LIMIT %s
+                ''', (page_size + 1,))
+            else:
+                cur.execute(f'''
+                    SELECT {PG_SESSION_COLUMNS}, start_time::text
+                    FROM sessions
+                    WHERE (start_time, session_id) < (CAST(%s AS TIMESTAMP), %s)
+                    ORDER BY start_time DESC, session_id DESC
+                    LIMIT %s
+                ''', (cursor[0], cursor[1], page_size + 1))
+            rows = cur.fetchall()
+
+        sessions = [database._session_from_row(row) for row in rows[:page_size]]
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = (rows[page_size - 1][-1], sessions[-1]['session_id'])
+        return sessions, next_cursor
+
+    def get_session_details(self, session_id):
+        return self.get_sessions_details([session_id]).get(session_id)
+
+    def get_sessions_details(self, session_ids, summaries=False):
+        if not session_ids:
+            return {}
+        ids = list(session_ids)
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(f'''
+                SELECT {PG_SESSION_COLUMNS}
+                FROM sessions
+                WHERE session_id = ANY(%s)
+            ''', (ids,))
+            sessions = {}
+            for row in cur.fetchall():
+                session = database._session_from_row(row)
+                session['answers'] = []
+                sessions[session['session_id']] = session
+
+            if summaries:
+                cur.execute('''
+                    SELECT session_id, question_number, question, user_answer, score
+                    FROM answers
+                    WHERE session_id = ANY(%s)
+                    ORDER BY session_id, question_number
+                ''', (ids,))
+                for session_id, number, question, user_answer, score in cur.fetchall():
+                    sessions[session_id]['answers'].append(
+                        AnswerSummary(session_id, number, question, user_answer, score, database._categorize(score))
+                    )
+            else:
+                cur.execute('''
+                    SELECT session_id, question_number, question, user_answer, ideal_answer,
+                           score, feedback, to_char(timestamp, 'YYYY-MM-DD HH24:MI:SS')
+                    FROM answers
+                    WHERE session_id = ANY(%s)
+                    ORDER BY session_id, question_number
+                ''', (ids,))
+                for row in cur.fetchall():
+                    sessions[row[0]]['answers'].append(database._answer_from_row(row[1:]))
+        return sessions
+
+    def get_statistics(self):
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute('SELECT session_count, scored_count, score_sum FROM stats_totals WHERE id = 1')
+            total_sessions, scored_count, score_sum = cur.fetchone() or (0, 0, 0.0)
+            overall_avg = score_sum / scored_count if scored_count else 0
+
+            cur.execute('''
+                SELECT role, score_sum, scored_count, session_count
+                FROM stats_by_role
+                ORDER BY role
+            ''')
+            role_stats = {
+                row[0]: {'average_score': round(row[1] / row[2], 1) if row[2] else 0, 'session_count': row[3]}
+                for row in cur.fetchall()
+            }
+
+            # A LIMIT scan of idx_sessions_status_start, not an aggregate
+
+            cur.execute('''
+                SELECT average_score
+                FROM sessions
+                WHERE status = 'completed'
+                ORDER BY start_time DESC
+                LIMIT %s
+            ''', (database.RECENT_SCORES_SIZE,))
+            recent_scores = [row[0] for row in cur.fetchall() if row[0]]
+
+        return {
+            'total_completed_sessions': total_sessions,
+            'overall_average_score': round(overall_avg, 1),
+            'performance_by_role': role_stats,
+            'trend': database.score_trend(recent_scores)
+        }
+
+    def get_score_timeseries(self, role=None, level=None, since=None, until=None, bucket='day'):
+        # Read from the stats_daily rollups; weeks start on Monday, as in database.py
+        formats = {'day': 'YYYY-MM-DD', 'week': 'YYYY-MM-DD', 'month': 'YYYY-MM'}
+        if bucket not in formats:
+            raise ValueError(f"Unsupported bucket: {bucket}")
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute('''
+                SELECT to_char(date_trunc(%s, day), %s) AS period, SUM(session_count)::bigint,
+                       SUM(scored_count)::bigint, SUM(score_sum), SUM(score_sq_sum), MIN(score_min), MAX(score_max)
+                FROM stats_daily
+                WHERE (%s IS NULL OR day >= CAST(%s AS DATE))
+                  AND (%s IS NULL OR day < CAST(%s AS DATE))
+                  AND (%s IS NULL OR role = %s)
+                  AND (%s IS NULL OR level = %s)
+                GROUP BY period
+                ORDER BY period
+            ''', (bucket, formats[bucket], since, since, until, until, role, role, level, level))
+            rows = cur.fetchall()
+
+        series = []
+        for period, sessions, scored, total, sq_total, low, high in rows:
+            mean = total / scored if scored else None
+            stddev = max(0.0, sq_total / scored - mean * mean) ** 0.5 if scored else None
+            series.append({
+                'period': period,
+                'sessions': sessions,
+                'average_score': round(mean, 2) if mean is not None else None,
+                'stddev': round(stddev, 2) if stddev is not None else None,
+                'min_score': low,
+                'max_score': high
+            })
+        return series
+
+    def _score_histogram(self, role, level):
+        # Same bins as the SQLite score_histogram table
+        counts = [0] * database.SCORE_HISTOGRAM_BINS
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute('''
+                SELECT bin, SUM(count)::bigint
+                FROM score_histogram
+                WHERE (%s IS NULL OR role = %s) AND (%s IS NULL OR level = %s)
+                GROUP BY bin
+            ''', (role, role, level, level))
+            for score_bin, count in cur.fetchall():
+                counts[score_bin] = count
+        return counts
+
+    def get_score_percentile(self, score, role=None, level=None):
+        return database.histogram_percentile(self._score_histogram(role, level), score)
+
+    def get_score_distribution(self, role=None, level=None):
+        counts = self._score_histogram(role, level)
+        return {'sessions': sum(counts), 'quantiles': database.histogram_quantiles(counts)}
+
+    def search_answers(self, query, role=None, level=None, offset=0, page_size=20):
+        if not query.strip():
+            return [], None
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(f'''
+                SELECT a.answer_id, a.session_id, s.role, s.level,
+                       to_char(s.start_time, 'YYYY-MM-DD HH24:MI:SS'),
+                       a.question_number, a.question, a.score,
+                       ts_headline('english', a.user_answer, q, 'StartSel=**, StopSel=**, MaxWords=16, MinWords=8')
+                FROM answers a
+                JOIN sessions s ON s.session_id = a.session_id,
+                     plainto_tsquery('english', %s) q
+                WHERE to_tsvector('english', {PG_SEARCH_DOCUMENT}) @@ q
+                  AND (%s IS NULL OR s.role = %s)
+                  AND (%s IS NULL OR s.level = %s)
+                ORDER BY ts_rank(to_tsvector('english', {PG_SEARCH_DOCUMENT}), q) DESC
+                LIMIT %s OFFSET %s
+            ''', (query, role, role, level, level, page_size + 1, offset))
+            rows = cur.fetchall()
+
+        results = [
+            {
+                'answer_id': row[0],
+                'session_id': row[1],
+                'role': row[2],
+                'level': row[3],
+                'start_time': row[4],
+                'question_number': row[5],
+                'question': row[6],
+                'score': row[7],
+                'category': database._categorize(row[7]),
+                'snippet': row[8]
+            }
+            for row in rows[:page_size]
+        ]
+        next_offset = offset + page_size if len(rows) > page_size else None
+        return results, next_offset
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if config.STORAGE_BACKEND == "postgres":
+                _storage = PostgresStorage()
+            elif config.STORAGE_BACKEND == "sqlite":
+                _storage = SQLiteStorage()
+            else:
+                raise ValueError(f"Unknown storage backend: {config.STORAGE_BACKEND}")
+        return _storage
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A fresh history database that every database call in the test uses."""
+    path = str(tmp_path / "history.db")
+    monkeypatch.setattr(database, 'DB_PATH', path)
+    database.clear_read_cache()
+    yield path
+    database.flush_writes()
+    database.close_connections()
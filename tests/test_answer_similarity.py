@@ -0,0 +1,27 @@
+import answer_similarity
+import database
+
+ANSWER = "A database index is a sorted structure that lets the engine find rows without scanning the whole table"
+
+
+def _save(text):
+    session_id = database.create_session('Backend Developer', 'Junior')
+    database.save_answer(session_id, 1, "Explain database indexes", text, "Ideal", {'score': 6.0})
+    return database.get_connection().execute(
+        'SELECT answer_id FROM answers WHERE session_id = ?', (session_id,)
+    ).fetchone()[0]
+
+
+def test_similar_answers_come_from_shared_buckets(db_path):
+    answer_ids = [_save(ANSWER) for _ in range(4)]
+    _save("Overfitting means the model memorises noise in the training data")
+
+    matches = answer_similarity.find_similar_answers(answer_ids[0])
+    assert sorted(match['answer_id'] for match in matches) == answer_ids[1:]
+    assert all(match['similarity'] == 1.0 for match in matches)
+
+
+def test_similar_answers_skip_oversized_buckets(db_path, monkeypatch):
+    answer_ids = [_save(ANSWER) for _ in range(4)]
+    monkeypatch.setattr(answer_similarity, 'LSH_MAX_BUCKET', 3)
+    assert answer_similarity.find_similar_answers(answer_ids[0]) == []
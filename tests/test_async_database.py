@@ -0,0 +1,97 @@
+"""async_database must return exactly what database returns for the same calls."""
+
+import asyncio
+
+import pytest
+
+import async_database
+import database
+
+SESSIONS = [
+    ('Data Scientist', 'Junior', [7.5, 4.0, 9.0]),
+    ('Backend Developer', 'Senior', [3.0, 6.5]),
+    ('Data Scientist', 'Mid', [8.0]),
+]
+
+
+def _evaluation(score):
+    return {'score': score, 'feedback': f"Scored {score}", 'scorer_version': 1, 'stage': 'embedding'}
+
+
+def _populate_sync():
+    for role, level, scores in SESSIONS:
+        session_id = database.create_session(role, level)
+        for number, score in enumerate(scores, 1):
+            database.save_answer(session_id, number, f"{role} question {number}", f"Answer {number}",
+                                 f"Ideal answer {number}", _evaluation(score))
+        database.complete_session(session_id, sum(scores) / len(scores), len(scores))
+
+
+async def _populate_async():
+    for role, level, scores in SESSIONS:
+        session_id = await async_database.create_session(role, level)
+        for number, score in enumerate(scores, 1):
+            await async_database.save_answer(session_id, number, f"{role} question {number}", f"Answer {number}",
+                                             f"Ideal answer {number}", _evaluation(score))
+        await async_database.complete_session(session_id, sum(scores) / len(scores), len(scores))
+
+
+def _without_times(session):
+    session = {key: value for key, value in session.items() if key not in ('start_time', 'end_time')}
+    session['answers'] = [{key: value for key, value in answer.items() if key != 'timestamp'}
+                          for answer in session.get('answers', [])]
+    return session
+
+
+@pytest.fixture
+def history(db_path):
+    _populate_sync()
+    return db_path
+
+
+@pytest.mark.parametrize('name, args', [
+    ('get_session_history', ()),
+    ('get_session_history', (2,)),
+    ('get_session_page', (None, 2)),
+    ('get_session_details', (1,)),
+    ('get_session_details', (99,)),
+    ('get_sessions_details', ([1, 2, 3],)),
+    ('get_statistics', ()),
+    ('get_score_timeseries', ()),
+    ('get_score_timeseries', ('Data Scientist', None, None, None, 'week')),
+])
+def test_reads_match(history, name, args):
+    expected = getattr(database, name)(*args)
+    database.clear_read_cache()
+    actual = asyncio.run(getattr(async_database, name)(*args))
+    assert actual == expected
+
+
+def test_session_pages_match(history):
+    cursor, pages = None, []
+    while True:
+        sync_page = database.get_session_page(cursor, 1)
+        database.clear_read_cache()
+        assert asyncio.run(async_database.get_session_page(cursor, 1)) == sync_page
+        pages.append(sync_page[0])
+        cursor = sync_page[1]
+        if cursor is None:
+            break
+    assert [session['session_id'] for page in pages for session in page] == [3, 2, 1]
+
+
+def test_writes_match(tmp_path, monkeypatch, db_path):
+    _populate_sync()
+    expected = [_without_times(database.get_session_details(session_id)) for session_id in (1, 2, 3)]
+
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / "async.db"))
+    database.clear_read_cache()
+    asyncio.run(_populate_async())
+    actual = [_without_times(database.get_session_details(session_id)) for session_id in (1, 2, 3)]
+    assert actual == expected
+
+
+def test_delete_matches(history):
+    asyncio.run(async_database.delete_session(2))
+    assert database.get_session_details(2) is None
+    assert [session['session_id'] for session in database.get_session_history()] == [3, 1]
@@ -0,0 +1,128 @@
+"""
+PostgresStorage against a live server. Skipped unless POSTGRES_DSN points at
+a reachable database; each test works in a schema of its own that is dropped
+afterwards.
+"""
+
+import os
+import uuid
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+from psycopg2.extensions import make_dsn
+
+from storage import PostgresStorage
+
+POSTGRES_DSN = os.getenv('POSTGRES_DSN')
+
+
+@pytest.fixture
+def storage():
+    if not POSTGRES_DSN:
+        pytest.skip("POSTGRES_DSN is not set")
+    try:
+        admin = psycopg2.connect(POSTGRES_DSN, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+    admin.autocommit = True
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    with admin.cursor() as cur:
+        cur.execute(f'CREATE SCHEMA {schema}')
+    backend = PostgresStorage(make_dsn(POSTGRES_DSN, options=f'-c search_path={schema}'), 1, 2)
+    try:
+        yield backend
+    finally:
+        backend.close()
+        with admin.cursor() as cur:
+            cur.execute(f'DROP SCHEMA {schema} CASCADE')
+        admin.close()
+
+
+def _evaluation(score, stage='embedding'):
+    return {'score': score, 'feedback': f"Scored {score}", 'scorer_version': 1, 'stage': stage}
+
+
+def _add_session(storage, role, level, scores):
+    session_id = storage.create_session(role, level)
+    for number, score in enumerate(scores, 1):
+        storage.save_answer(session_id, number, f"{role} question {number}",
+                            f"My answer about indexes and joins {number}", f"Ideal answer {number}", _evaluation(score))
+    storage.complete_session(session_id, sum(scores) / len(scores), len(scores))
+    return session_id
+
+
+def test_session_roundtrip(storage):
+    session_id = _add_session(storage, 'Backend Developer', 'Senior', [6.0, 8.0])
+    session = storage.get_session_details(session_id)
+    assert session['role'] == 'Backend Developer'
+    assert session['status'] == 'completed'
+    assert session['average_score'] == 7.0
+    assert [answer['score'] for answer in session['answers']] == [6.0, 8.0]
+    assert session['answers'][0]['feedback']['main_feedback'] == "Scored 6.0"
+
+    with storage._connection() as conn, conn.cursor() as cur:
+        cur.execute('SELECT scorer_version, scoring_stage FROM answers WHERE session_id = %s', (session_id,))
+        assert cur.fetchall() == [(1, 'embedding'), (1, 'embedding')]
+
+    storage.delete_session(session_id)
+    assert storage.get_session_details(session_id) is None
+
+
+def test_session_page_keeps_sessions_within_one_second(storage):
+    session_ids = [_add_session(storage, 'Data Scientist', 'Junior', [5.0]) for _ in range(5)]
+    with storage._connection() as conn, conn.cursor() as cur:
+        # Distinct start times that all fall inside the same second
+        for k, session_id in enumerate(session_ids):
+            cur.execute('UPDATE sessions SET start_time = %s WHERE session_id = %s',
+                        (f"2026-01-01 10:00:00.{k + 1:06d}", session_id))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = storage.get_session_page(cursor, 2)
+        seen += [session['session_id'] for session in page]
+        if cursor is None:
+            break
+    assert seen == session_ids[::-1]
+
+
+def test_statistics_and_percentiles(storage):
+    _add_session(storage, 'Data Scientist', 'Junior', [2.0, 4.0])
+    _add_session(storage, 'Data Scientist', 'Junior', [8.0])
+    _add_session(storage, 'Backend Developer', 'Senior', [6.0])
+
+    stats = storage.get_statistics()
+    assert stats['total_completed_sessions'] == 3
+    assert stats['performance_by_role']['Data Scientist'] == {'average_score': 5.5, 'session_count': 2}
+
+    assert storage.get_score_distribution('Data Scientist', 'Junior')['sessions'] == 2
+    assert storage.get_score_percentile(10.0, 'Data Scientist', 'Junior') == pytest.approx(100.0)
+
+    periods = storage.get_score_timeseries(role='Data Scientist')
+    assert sum(period['sessions'] for period in periods) == 2
+
+
+def test_statistics_follow_recompletion_and_delete(storage):
+    kept = _add_session(storage, 'Data Scientist', 'Junior', [4.0])
+    dropped = _add_session(storage, 'Backend Developer', 'Senior', [6.0])
+    storage.complete_session(kept, 8.0, 1)
+    storage.delete_session(dropped)
+
+    stats = storage.get_statistics()
+    assert stats['total_completed_sessions'] == 1
+    assert stats['overall_average_score'] == 8.0
+    assert stats['performance_by_role'] == {'Data Scientist': {'average_score': 8.0, 'session_count': 1}}
+
+    periods = storage.get_score_timeseries()
+    assert [(period['sessions'], period['min_score'], period['max_score']) for period in periods] == [(1, 8.0, 8.0)]
+
+    assert storage.get_score_distribution()['sessions'] == 1
+    assert storage.get_score_percentile(6.0) == pytest.approx(0.0)
+
+
+def test_search_answers(storage):
+    session_id = _add_session(storage, 'Backend Developer', 'Mid', [7.0])
+    results, next_offset = storage.search_answers("indexes")
+    assert [result['session_id'] for result in results] == [session_id]
+    assert next_offset is None
+    assert storage.search_answers("   ") == ([], None)
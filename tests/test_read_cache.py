@@ -0,0 +1,35 @@
+import database
+
+
+def _traced_statements():
+    statements = []
+    database.get_connection().set_trace_callback(statements.append)
+    return statements
+
+
+def _session(role, score):
+    session_id = database.create_session(role, 'Junior')
+    database.save_answer(session_id, 1, "Explain database indexes", "Indexes speed up lookups", "Ideal", {'score': score})
+    database.complete_session(session_id, score, 1)
+    return session_id
+
+
+def test_history_listing_and_search_are_served_from_cache(db_path):
+    ids = [_session('Data Scientist', 7.0), _session('Backend Developer', 4.0)]
+    first_details = database.get_sessions_details(ids, summaries=True)
+    first_search = database.search_answers("indexes")
+
+    statements = _traced_statements()
+    assert database.get_sessions_details(ids, summaries=True) == first_details
+    assert database.search_answers("indexes") == first_search
+    assert not any('answer_texts' in sql or 'answers_fts' in sql for sql in statements)
+
+
+def test_cache_is_invalidated_by_writes(db_path):
+    session_id = _session('Data Scientist', 7.0)
+    assert len(database.get_sessions_details([session_id])[session_id]['answers']) == 1
+    assert len(database.search_answers("indexes")[0]) == 1
+
+    database.save_answer(session_id, 2, "Explain indexes again", "Indexes are B-trees", "Ideal", {'score': 6.0})
+    assert len(database.get_sessions_details([session_id])[session_id]['answers']) == 2
+    assert len(database.search_answers("indexes")[0]) == 2
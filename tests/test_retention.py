@@ -0,0 +1,44 @@
+import os
+
+import database
+import retention
+
+
+def _old_session(role):
+    session_id = database.create_session(role, 'Junior')
+    database.save_answer(session_id, 1, "Question", "Answer", "Ideal", {'score': 6.0})
+    database.complete_session(session_id, 6.0, 1)
+    with database.transaction() as conn:
+        conn.execute("UPDATE sessions SET start_time = datetime('now', '-400 days') WHERE session_id = ?", (session_id,))
+    return session_id
+
+
+def test_archives_the_given_database_only(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'TENANT_DATA_DIR', str(tmp_path / "tenants"))
+    kept = _old_session('Backend Developer')
+    with database.tenant_scope('acme'):
+        archived = _old_session('Data Scientist')
+        tenant_path = database.current_db_path()
+
+        stats = retention.run_retention(days=180, archive_dir=str(tmp_path / "archive"))
+        assert stats['archived'] == 1
+        assert database.DB_PATH == db_path
+        assert database.get_session_details(archived)['role'] == 'Data Scientist'
+
+    assert os.path.dirname(tenant_path) == str(tmp_path / "tenants")
+    assert database.get_session_details(kept)['answers'][0]['user_answer'] == "Answer"
+    assert database.get_connection().execute('SELECT COUNT(*) FROM archived_sessions').fetchone()[0] == 0
+
+
+def test_compaction_shrinks_the_file(db_path, tmp_path):
+    for _ in range(200):
+        session_id = _old_session('Backend Developer')
+        database.save_answer(session_id, 2, "Second question", "A long answer " * 200, "Ideal", {'score': 5.0})
+    conn = database.get_connection()
+    pages_before = conn.execute('PRAGMA page_count').fetchone()[0]
+
+    stats = retention.run_retention(days=180, archive_dir=str(tmp_path / "archive"), batch_size=50)
+    assert stats['archived'] == 200
+    assert stats['pages_freed'] > 1
+    assert conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+    assert conn.execute('PRAGMA page_count').fetchone()[0] < pages_before
@@ -0,0 +1,42 @@
+import database
+
+
+def test_writers_are_bounded_and_evicted_writers_drained(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'TENANT_DATA_DIR', str(tmp_path / "tenants"))
+    monkeypatch.setattr(database, 'MAX_OPEN_SHARDS', 2)
+    tenants = ['alpha', 'beta', 'gamma', 'delta']
+    sessions = {}
+    try:
+        for tenant in tenants:
+            with database.tenant_scope(tenant):
+                session_id = database.create_session('Data Scientist', 'Junior')
+                database.save_answer_deferred(session_id, 1, "Question", f"{tenant} answer", "Ideal", {'score': 7.0})
+                database.complete_session_deferred(session_id, 7.0, 1)
+                sessions[tenant] = session_id
+            assert len(database._writers) <= 2
+
+        evicted = database.tenant_db_path('alpha')
+        assert evicted not in database._writers
+        for tenant in tenants:
+            with database.tenant_scope(tenant):
+                session = database.get_session_details(sessions[tenant])
+            assert session['status'] == 'completed'
+            assert session['answers'][0]['user_answer'] == f"{tenant} answer"
+    finally:
+        database.close_writers()
+
+
+def test_all_tenants_statistics_include_deferred_completions(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'TENANT_DATA_DIR', str(tmp_path / "tenants"))
+    try:
+        for tenant, score in (('alpha', 4.0), ('beta', 8.0)):
+            with database.tenant_scope(tenant):
+                session_id = database.create_session('Data Scientist', 'Junior')
+                database.complete_session_deferred(session_id, score, 1)
+
+        stats = database.get_all_tenants_statistics()
+        assert stats['total_completed_sessions'] == 2
+        assert stats['overall_average_score'] == 6.0
+        assert stats['trend'] == "Stable"
+    finally:
+        database.close_writers()